@@ -1,9 +1,11 @@
 #!/usr/bin/env python3
 """Analysis/plot script for Experiment 0 (hnswlib DRAM upper bound).
 
-- Discovers JSON result files in ../results/raw by default.
+- Discovers JSON / NDJSON result files in ../results/raw by default.
 - Prints a summary table of key metrics.
 - Generates simple plots (recall vs QPS, build/search time) if matplotlib is available.
+  Plots newer than every input JSON, and drawn from the same input files, are
+  left alone; pass --force to re-render.
 
 Usage (from project root via WSL):
 
@@ -16,67 +18,130 @@ You can also override the glob pattern:
 
 import argparse
 import json
+import sys
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
+
+# Shared analyzer helpers live in the project-level scripts/ directory.
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "scripts"))
+
+from analyze_common import fast_glob, load_cached_rows  # noqa: E402
 
 try:
+    import orjson  # type: ignore
+
+    _json_loads = orjson.loads
+except ImportError:  # pragma: no cover
+    _json_loads = json.loads
+
+try:
+    import matplotlib  # type: ignore
+
+    # Files only: skip interactive backend negotiation.
+    matplotlib.use("Agg")
     import matplotlib.pyplot as plt  # type: ignore
     from matplotlib.ticker import FuncFormatter
+    import numpy as np  # matplotlib hard dependency
     HAS_MPL = True
 except Exception:  # pragma: no cover
     HAS_MPL = False
 
 
-def load_results(paths: List[Path]) -> List[Dict[str, Any]]:
-    rows = []
-    for p in paths:
-        try:
-            with p.open("r", encoding="utf-8") as f:
-                data = json.load(f)
-        except Exception as e:  # pragma: no cover - diagnostics only
-            print(f"[WARN] Failed to load {p}: {e}")
-            continue
-
-        cfg = data.get("config", {})
-        agg = data.get("aggregate", {})
-
-        qps_search = agg.get("qps_search")
-        if qps_search is None:
-            qps_search = agg.get("search_qps")
-        if qps_search is None:
-            qps_search = agg.get("qps")
-
-        qps_total = agg.get("qps_total")
-        if qps_total is None:
-            qps_total = agg.get("total_qps")
-        if qps_total is None:
-            qps_total = agg.get("qps")
-
-        rows.append(
-            {
-                "file": p.name,
-                "name": data.get("name", p.stem),
-                "dataset": cfg.get("dataset_name", ""),
-                "num_base": cfg.get("num_base"),
-                "num_queries": cfg.get("num_queries"),
-                "ef_search": cfg.get("ef_search"),
-                "recall": agg.get("recall_at_k"),
-                "build_time_s": agg.get("build_time_s"),
-                "search_time_s": agg.get("search_time_s"),
-                "qps_total": qps_total,
-                "qps_search": qps_search,
-            }
-        )
+def _row_from_data(p: Path, data: Dict[str, Any]) -> Dict[str, Any]:
+    cfg = data.get("config", {})
+    agg = data.get("aggregate", {})
+
+    qps_search = agg.get("qps_search")
+    if qps_search is None:
+        qps_search = agg.get("search_qps")
+    if qps_search is None:
+        qps_search = agg.get("qps")
+
+    qps_total = agg.get("qps_total")
+    if qps_total is None:
+        qps_total = agg.get("total_qps")
+    if qps_total is None:
+        qps_total = agg.get("qps")
+
+    return {
+        "file": p.name,
+        "name": data.get("name", p.stem),
+        "dataset": cfg.get("dataset_name", ""),
+        "num_base": cfg.get("num_base"),
+        "num_queries": cfg.get("num_queries"),
+        "ef_search": cfg.get("ef_search"),
+        "recall": agg.get("recall_at_k"),
+        "build_time_s": agg.get("build_time_s"),
+        "search_time_s": agg.get("search_time_s"),
+        "qps_total": qps_total,
+        "qps_search": qps_search,
+    }
+
+
+def _rows_from_file(p: Path) -> List[Dict[str, Any]]:
+    """Rows for one result file: a single JSON document or NDJSON (one per line)."""
+
+    if p.suffix == ".ndjson":
+        with p.open("rb") as f:
+            return [_row_from_data(p, _json_loads(line)) for line in f if line.strip()]
+    return [_row_from_data(p, _json_loads(p.read_bytes()))]
+
+
+def _row_sort_key(r: Dict[str, Any]) -> Tuple[int, int]:
+    return (int(r["num_base"] or 0), int(r["ef_search"] or 0))
+
+
+# Bump when _rows_from_file's output changes so rows cached by older logic
+# are re-parsed instead of served.
+ROW_CACHE_SCHEMA = 1
+
+
+def load_results(paths: List[Path], cache_path: Optional[Path] = None) -> List[Dict[str, Any]]:
+    """Flatten result JSON/NDJSON files into rows, one per run name.
+
+    Rows are returned sorted by (num_base, ef_search) so consumers need not
+    re-sort.
+
+    When a run name appears more than once (e.g. a legacy per-config JSON and
+    the NDJSON from a newer run), the later path wins. When cache_path is
+    given, each file's rows are memoized there keyed by
+    (path, mtime_ns, size) under ROW_CACHE_SCHEMA, so unchanged files cost
+    only a stat() on re-runs.
+    """
+
+    by_name: Dict[str, Dict[str, Any]] = {}
+    for file_rows in load_cached_rows(paths, _rows_from_file, cache_path, ROW_CACHE_SCHEMA):
+        for row in file_rows:
+            by_name[row["name"]] = dict(row)
+
+    rows = list(by_name.values())
+    rows.sort(key=_row_sort_key)
     return rows
 
 
+# (row key, format spec) per summary-table column. An empty spec is plain
+# str(); numeric specs render missing values as an empty cell.
+_TABLE_FIELDS = (
+    ("name", ""),
+    ("dataset", ""),
+    ("num_base", ""),
+    ("num_queries", ""),
+    ("ef_search", ""),
+    ("recall", ".6f"),
+    ("qps_total", ".3f"),
+    ("qps_search", ".3f"),
+    ("build_time_s", ".4f"),
+    ("search_time_s", ".4f"),
+)
+
+
 def print_table(rows: List[Dict[str, Any]]) -> None:
     if not rows:
         print("No Experiment 0 results to show.")
         return
 
     headers = [
-        "file",
+        "name",
         "dataset",
         "num_base",
         "num_q",
@@ -93,26 +158,20 @@ def print_table(rows: List[Dict[str, Any]]) -> None:
     for r in rows:
         print(
             "\t".join(
-                [
-                    str(r["file"]),
-                    str(r["dataset"]),
-                    str(r["num_base"]),
-                    str(r["num_queries"]),
-                    str(r["ef_search"]),
-                    f"{r['recall']:.6f}" if r["recall"] is not None else "",
-                    f"{r['qps_total']:.3f}" if r["qps_total"] is not None else "",
-                    f"{r['qps_search']:.3f}" if r["qps_search"] is not None else "",
-                    f"{r['build_time_s']:.4f}" if r["build_time_s"] is not None else "",
-                    f"{r['search_time_s']:.4f}" if r["search_time_s"] is not None else "",
-                ]
+                "" if (v := r[key]) is None and spec else format(v, spec)
+                for key, spec in _TABLE_FIELDS
             )
         )
 
 
+# Largest threshold first; the first one <= |v| picks the suffix.
+_SUFFIX_TABLE = ((1e9, "G"), (1e6, "M"), (1e3, "k"))
+
+
 def _format_k(value: Any) -> str:
-    """Format a numeric value using a compact k-suffix when appropriate.
+    """Format a numeric value using a compact k/M/G suffix when appropriate.
 
-    Examples: 0 -> "0", 1200 -> "1k", 25853 -> "26k".
+    Examples: 0 -> "0", 1200 -> "1k", 25853 -> "26k", 1.2e6 -> "1M".
     """
     if value is None:
         return ""
@@ -125,8 +184,9 @@ def _format_k(value: Any) -> str:
         return "0"
 
     abs_v = abs(v)
-    if abs_v >= 1000.0:
-        return f"{int(round(v / 1000.0))}k"
+    for threshold, suffix in _SUFFIX_TABLE:
+        if abs_v >= threshold:
+            return f"{int(round(v / threshold))}{suffix}"
 
     return f"{v:g}"
 
@@ -164,29 +224,58 @@ def _config_label(r: Dict[str, Any]) -> str:
     return f"{n_str}, ef={ef_str}"
 
 
-def make_plots(rows: List[Dict[str, Any]], out_dir: Path) -> None:
+PLOT_FILES = ("exp0_recall_search_qps.png", "exp0_build_search_time.png")
+
+
+def _plots_up_to_date(input_paths: List[Path], out_dir: Path, record_path: Path) -> bool:
+    """True when every plot exists, is newer than all inputs and this script,
+    and was rendered from exactly these input files (per record_path).
+
+    mtimes alone miss a deleted input, which leaves the remaining files
+    older than the PNGs that still show its rows.
+    """
+
+    try:
+        out_mtime = min((out_dir / name).stat().st_mtime for name in PLOT_FILES)
+        in_mtime = max(p.stat().st_mtime for p in [*input_paths, Path(__file__)])
+        recorded = record_path.read_text(encoding="utf-8").splitlines()
+    except OSError:
+        return False
+    return out_mtime > in_mtime and recorded == [str(p) for p in input_paths]
+
+
+def make_plots(
+    rows: List[Dict[str, Any]],
+    out_dir: Path,
+    input_paths: Optional[List[Path]] = None,
+    record_path: Optional[Path] = None,
+    force: bool = False,
+) -> None:
     if not HAS_MPL:
         print("[INFO] matplotlib not available; skipping Experiment 0 plots.")
         return
     if not rows:
         return
+    if (
+        not force
+        and input_paths
+        and record_path is not None
+        and _plots_up_to_date(input_paths, out_dir, record_path)
+    ):
+        print("[INFO] Experiment 0 plots up-to-date; skipping re-render.")
+        return
 
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    # Sort for a stable order: by dataset, then ef_search, then num_base
-    rows_sorted = sorted(
-        rows,
-        key=lambda r: (int(r["num_base"] or 0), int(r["ef_search"] or 0)),
-    )
-
-    labels = [r["name"] for r in rows_sorted]
+    # rows arrive presorted from load_results (num_base, then ef_search).
+    labels = [r["name"] for r in rows]
     x = list(range(len(labels)))
 
-    recall = [r["recall"] for r in rows_sorted]
-    search_qps = [r["qps_search"] for r in rows_sorted]
+    recall = [r["recall"] for r in rows]
+    search_qps = [r["qps_search"] for r in rows]
 
     # Plot 1: Recall vs search QPS
-    fig, ax1 = plt.subplots(figsize=(8, 4))
+    fig, ax1 = plt.subplots(figsize=(8, 4), layout="constrained")
 
     line1 = ax1.plot(x, recall, marker="o", color="C0", label="Recall @ k")[0]
     ax1.set_ylabel("Recall @ k")
@@ -197,55 +286,54 @@ def make_plots(rows: List[Dict[str, Any]], out_dir: Path) -> None:
     ax2.set_ylabel("Search QPS")
     ax2.yaxis.set_major_formatter(FuncFormatter(_k_formatter))
 
-    tick_labels = [_config_label(r) for r in rows_sorted]
+    tick_labels = [_config_label(r) for r in rows]
     ax1.set_xticks(x)
     ax1.set_xticklabels(tick_labels, rotation=0, ha="center")
     ax1.set_xlabel("Configuration (dataset, ef_search)")
     ax1.set_title("Experiment 0: Recall vs Search QPS\n(HNSWlib)")
 
     ax1.legend([line1, line2], [line1.get_label(), line2.get_label()], loc="lower left")
-    fig.tight_layout()
-    fig.subplots_adjust(bottom=0.3)
-    fig.savefig(out_dir / "exp0_recall_search_qps.png", dpi=150)
+    fig.savefig(out_dir / PLOT_FILES[0], dpi=150)
     plt.close(fig)
 
     # Plot 2: build and search time per configuration
     # Build per-configuration subplots for build/search time so each can
     # use its own y-scale and add value annotations.
-    build = [r["build_time_s"] for r in rows_sorted]
-    search = [r["search_time_s"] for r in rows_sorted]
-
-    num_cfg = len(rows_sorted)
-    if num_cfg == 0:
-        return
+    # (num_cfg, 2) build/search matrix: y-limits and labels in one pass each.
+    times = np.array(
+        [[r["build_time_s"] or 0.0, r["search_time_s"] or 0.0] for r in rows],
+        dtype=float,
+    )
+    # Add a bit of headroom so labels do not clip.
+    ylims = times.max(axis=1) * 1.15
+    annotations = np.char.mod("%.3f", times)
 
-    fig, axes = plt.subplots(num_cfg, 1, figsize=(8, 3 * num_cfg), sharex=False)
+    num_cfg = len(rows)
+    fig, axes = plt.subplots(
+        num_cfg, 1, figsize=(8, 3 * num_cfg), sharex=False, layout="constrained"
+    )
     if num_cfg == 1:
         axes = [axes]  # type: ignore[list-item]
 
-    for ax, r, b_val, s_val in zip(axes, rows_sorted, build, search):
+    x_local = [0, 1]
+    labels_local = ["Build", "Search"]
+    for i, (ax, r) in enumerate(zip(axes, rows)):
         cfg_label = _config_label(r)
-        x_local = [0, 1]
-        labels_local = ["Build", "Search"]
-        vals = [b_val, s_val]
 
-        bars = ax.bar(x_local, vals, color=["C0", "C1"])
+        bars = ax.bar(x_local, times[i], color=["C0", "C1"])
         ax.set_xticks(x_local)
         ax.set_xticklabels(labels_local)
         ax.set_ylabel("Time (s)")
         ax.set_title(cfg_label)
 
-        # Add a bit of headroom so labels do not clip.
-        ymax = max(vals) if vals else 0.0
-        if ymax > 0:
-            ax.set_ylim(0, ymax * 1.15)
+        if ylims[i] > 0:
+            ax.set_ylim(0, ylims[i])
 
         # Annotate each bar with its value.
-        for bar in bars:
-            height = bar.get_height()
+        for bar, text in zip(bars, annotations[i]):
             ax.annotate(
-                f"{height:.3f}",
-                xy=(bar.get_x() + bar.get_width() / 2.0, height),
+                text,
+                xy=(bar.get_x() + bar.get_width() / 2.0, bar.get_height()),
                 xytext=(0, 3),
                 textcoords="offset points",
                 ha="center",
@@ -254,10 +342,16 @@ def make_plots(rows: List[Dict[str, Any]], out_dir: Path) -> None:
             )
 
     fig.suptitle("Experiment 0: Build vs Search Time\n(HNSWlib)")
-    fig.tight_layout(rect=(0.0, 0.03, 1.0, 1.0))
-    fig.savefig(out_dir / "exp0_build_search_time.png", dpi=150)
+    fig.savefig(out_dir / PLOT_FILES[1], dpi=150)
     plt.close(fig)
 
+    if input_paths and record_path is not None:
+        try:
+            record_path.parent.mkdir(parents=True, exist_ok=True)
+            record_path.write_text("".join(f"{p}\n" for p in input_paths), encoding="utf-8")
+        except OSError as e:  # pragma: no cover - diagnostics only
+            print(f"[WARN] Failed to write plot input record {record_path}: {e}")
+
 
 def main() -> int:
     parser = argparse.ArgumentParser(description="Analyze Experiment 0 hnswlib baseline results.")
@@ -267,25 +361,44 @@ def main() -> int:
         default=None,
         help=(
             "Glob pattern for JSON files, interpreted relative to the experiment "
-            "directory (default: results/raw/hnswlib_*.json)"
+            "directory (default: results/raw/hnswlib_*.json plus hnswlib_*.ndjson)"
         ),
     )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Re-render plots even if they are newer than every input JSON",
+    )
     args = parser.parse_args()
 
     script_path = Path(__file__).resolve()
     exp_dir = script_path.parent.parent
 
     pattern = args.glob or "results/raw/hnswlib_*.json"
-    paths = sorted(exp_dir.glob(pattern))
+    if args.glob is None:
+        raw_dir = exp_dir / "results" / "raw"
+        # Legacy per-config JSONs first so rows from the NDJSON run log win.
+        paths = fast_glob(raw_dir, "hnswlib_", ".json") + fast_glob(raw_dir, "hnswlib_", ".ndjson")
+    else:
+        paths = sorted(exp_dir.glob(pattern))
     if not paths:
         print(f"No JSON files found for pattern: {exp_dir / pattern}")
         return 0
 
-    rows = load_results(paths)
+    cache_dir = exp_dir / "results" / "raw" / ".cache"
+    rows = load_results(paths, cache_dir / "analyze_rows.pkl")
     print_table(rows)
 
     plots_dir = exp_dir / "results" / "plots"
-    make_plots(rows, plots_dir)
+    # A custom --glob always re-renders; it still records its inputs, so the
+    # next default run sees a different file list and re-renders too.
+    make_plots(
+        rows,
+        plots_dir,
+        paths,
+        cache_dir / "plot_inputs.txt",
+        force=args.force or args.glob is not None,
+    )
 
     return 0
 
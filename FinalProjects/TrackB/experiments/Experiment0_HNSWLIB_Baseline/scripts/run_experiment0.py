@@ -1,143 +1,298 @@
 #!/usr/bin/env python3
 import json
-import re
-import subprocess
+import os
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
+SCRIPT_PATH = Path(__file__).resolve()
+EXPERIMENT_DIR = SCRIPT_PATH.parent.parent
+PROJECT_DIR = EXPERIMENT_DIR.parent.parent
 
-def _parse(label: str, text: str, pattern: str) -> float:
-    m = re.search(pattern, text)
-    if not m:
-        raise RuntimeError(f"Failed to parse {label} from output")
-    return float(m.group(1))
 
+def _physical_cores() -> int:
+    """Physical cores available to this process (SMT siblings excluded).
 
-def _run_one(cfg, project_dir: Path, experiment_dir: Path):
-    script = project_dir / "scripts" / "compare_hnswlib_sift.py"
-    data_dir = project_dir / "data" / "SIFT1M" / "sift"
-    base = data_dir / "sift_base.fvecs"
-    query = data_dir / "sift_query.fvecs"
-    groundtruth = data_dir / "sift_groundtruth.ivecs"
+    HNSW traversal is memory-latency bound and loses QPS when two threads
+    share a core, so thread counts are sized to physical cores.
+    """
 
-    out_dir = experiment_dir / "results" / "raw"
-    out_dir.mkdir(parents=True, exist_ok=True)
-    json_path = out_dir / f"hnswlib_{cfg['name']}.json"
-
-    cmd = [
-        "python3",
-        str(script),
-        "--base",
-        str(base),
-        "--query",
-        str(query),
-        "--num-base",
-        str(cfg["num_base"]),
-        "--num-queries",
-        str(cfg["num_queries"]),
-        "--dim",
-        "128",
-        "--k",
-        "10",
-        "--M",
-        "24",
-        "--ef-construction",
-        "300",
-        "--ef-search",
-        str(cfg["ef_search"]),
-    ]
+    try:
+        available = len(os.sched_getaffinity(0))
+    except AttributeError:  # non-Linux
+        available = os.cpu_count() or 1
+    try:
+        import psutil  # type: ignore
 
-    # For SIFT20k subset runs, let compare_hnswlib_sift.py compute
-    # brute-force ground truth on the 20k subset by *omitting*
-    # --groundtruth. For full SIFT1M, use the provided 1M groundtruth
-    # file to avoid an expensive brute-force pass.
-    if cfg.get("use_groundtruth", True):
-        cmd.extend([
-            "--groundtruth",
-            str(groundtruth),
-        ])
-
-    print("\n=== Running", cfg["name"], "===")
-    proc = subprocess.run(cmd, capture_output=True, text=True)
-    sys.stdout.write(proc.stdout)
-    if proc.returncode != 0:
-        sys.stderr.write(proc.stderr)
-        raise SystemExit(proc.returncode)
-
-    stdout = proc.stdout
-    recall = _parse("recall", stdout, r"recall@\d+ = ([0-9.]+)")
-    build_time = _parse("build_time_s", stdout, r"build_time_s = ([0-9.]+)")
-    search_time = _parse("search_time_s", stdout, r"search_time_s = ([0-9.]+)")
-    total_qps = _parse("total_QPS", stdout, r"total_QPS = ([0-9.]+)")
-    search_qps = _parse("search_QPS", stdout, r"search_QPS = ([0-9.]+)")
+        physical = psutil.cpu_count(logical=False)
+    except ImportError:
+        physical = None
+    return max(1, min(available, physical or available))
+
+
+NUM_CORES = _physical_cores()
+
+# Must be set before numpy/BLAS initialize their thread pools; explicit
+# user settings win.
+for _var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+    os.environ.setdefault(_var, str(NUM_CORES))
+
+# compare_hnswlib_sift lives in the project-level scripts/ directory; import
+# it directly so every configuration runs in this process instead of paying
+# interpreter startup + dataset reload per subprocess.
+sys.path.insert(0, str(PROJECT_DIR / "scripts"))
+
+import compare_hnswlib_sift as chs  # noqa: E402
+import numpy as np  # noqa: E402
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover
+    orjson = None
+
+# All runs of one invocation land in a single NDJSON file (one result per
+# line) so the analyzer opens one file regardless of sweep length. Lines are
+# appended to a sibling temp file that replaces it only once every run
+# succeeded, so a failed invocation keeps the previous complete log.
+RUNS_NDJSON = "hnswlib_runs.ndjson"
+RUNS_NDJSON_TMP = RUNS_NDJSON + ".tmp"
+
+
+def _write_result(cfg, efs: int, metrics, paths, experiment_dir: Path, build_threads: int):
+    name = f"{cfg['dataset'].lower()}_M{cfg['M']}_efc{cfg['ef_construction']}_efs{efs}"
+    ndjson_path = experiment_dir / "results" / "raw" / RUNS_NDJSON_TMP
 
     result = {
-        "name": cfg["name"],
+        "name": name,
         "config": {
             "dataset_name": cfg["dataset"],
-            "base_path": str(base),
-            "query_path": str(query),
-            "groundtruth_path": str(groundtruth),
+            "base_path": str(paths["base"]),
+            "query_path": str(paths["query"]),
+            "groundtruth_path": str(paths["groundtruth"]),
             "num_base": cfg["num_base"],
             "num_queries": cfg["num_queries"],
             "dim": 128,
             "k": 10,
-            "M": 24,
-            "ef_construction": 300,
-            "ef_search": cfg["ef_search"],
+            "M": cfg["M"],
+            "ef_construction": cfg["ef_construction"],
+            "ef_search": efs,
+            # Builds share the machine (see main); every sweep runs alone.
+            "build_threads": build_threads,
+            "search_threads": NUM_CORES,
         },
         "aggregate": {
-            "recall_at_k": recall,
-            "build_time_s": build_time,
-            "search_time_s": search_time,
-            "qps": search_qps,
-            "qps_search": search_qps,
-            "qps_total": total_qps,
+            "recall_at_k": metrics["recall_at_k"],
+            "build_time_s": metrics["build_time_s"],
+            "search_time_s": metrics["search_time_s"],
+            "qps": metrics["qps_search"],
+            "qps_search": metrics["qps_search"],
+            "qps_total": metrics["qps_total"],
         },
     }
 
-    with json_path.open("w", encoding="utf-8") as f:
-        json.dump(result, f, indent=2)
+    if orjson is not None:
+        line = orjson.dumps(result) + b"\n"
+    else:
+        line = (json.dumps(result) + "\n").encode("utf-8")
+
+    # Only the main thread writes (sweeps run after all builds finish).
+    with ndjson_path.open("ab") as f:
+        f.write(line)
 
     return result
 
 
+def _cached_bruteforce_gt(cfg, base, queries, k: int, experiment_dir: Path):
+    """Brute-force L2 groundtruth, memoized as .npy across invocations.
+
+    Keyed by dataset name, subset sizes, k and metric; delete
+    results/raw/.cache if the underlying SIFT files change.
+    """
+
+    cache_dir = experiment_dir / "results" / "raw" / ".cache"
+    key = f"{cfg['dataset'].lower()}_n{base.shape[0]}_nq{queries.shape[0]}_k{k}_l2"
+    cache_path = cache_dir / f"gt_{key}.npy"
+
+    if cache_path.exists():
+        gt = np.load(cache_path)
+        if gt.shape == (queries.shape[0], k):
+            print(f"[{cfg['dataset']}] groundtruth cache hit: {cache_path.name}")
+            return gt
+
+    gt = chs.compute_bruteforce_gt(base, queries, k)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    np.save(cache_path, gt)
+    return gt
+
+
+def _prepare_group(cfg, dataset, experiment_dir: Path):
+    """Slice one group's base/queries and resolve its groundtruth.
+
+    Returns (base, queries, gt).
+    """
+
+    base_all, query_all, gt_full, _paths = dataset
+
+    num_base = min(cfg["num_base"], base_all.shape[0])
+    num_queries = min(cfg["num_queries"], query_all.shape[0])
+    base = base_all[:num_base]
+    queries = query_all[:num_queries]
+
+    # For SIFT20k subset runs, compute brute-force ground truth on the 20k
+    # subset. For full SIFT1M, use the provided 1M groundtruth file to avoid
+    # an expensive brute-force pass.
+    if cfg.get("use_groundtruth", True):
+        gt = chs.mask_groundtruth(gt_full, num_base, num_queries)
+    else:
+        gt = _cached_bruteforce_gt(cfg, base, queries, 10, experiment_dir)
+    return base, queries, gt
+
+
+def _build_group(cfg, base, num_threads: int = -1):
+    """Build one index per (dataset, num_base, M, ef_construction).
+
+    Returns (index, build_time).
+    """
+
+    tag = f"[{cfg['dataset']}]"
+    print(f"{tag} building M={cfg['M']} efc={cfg['ef_construction']} threads={num_threads}")
+    index, build_time = chs.build_index(base, cfg["M"], cfg["ef_construction"], num_threads)
+    print(f"{tag} build_time_s = {build_time:.4f}")
+    return index, build_time
+
+
+def _search_group(cfg, built, paths, experiment_dir: Path, build_threads: int):
+    """Sweep ef_search over one built index on all cores.
+
+    ef_search is a query-time knob only, so every value in the sweep reuses
+    the same graph and reports the same build time.
+    """
+
+    index, build_time, queries, gt = built
+    # build_index leaves its thread count on the index; searches always use
+    # every core so search QPS does not depend on the build split.
+    index.set_num_threads(NUM_CORES)
+
+    tag = f"[{cfg['dataset']}]"
+    results = []
+    for efs in cfg["ef_search_sweep"]:
+        metrics = chs.search_index(index, queries, gt, efs, 10, build_time)
+        print(
+            f"{tag} ef_search={efs} recall@10={metrics['recall_at_k']:.6f} "
+            f"search_time_s={metrics['search_time_s']:.4f} "
+            f"total_QPS={metrics['qps_total']:.3f} search_QPS={metrics['qps_search']:.3f}"
+        )
+        results.append(_write_result(cfg, efs, metrics, paths, experiment_dir, build_threads))
+
+    return results
+
+
+def _thread_budget(runs):
+    """Split cores across concurrently running groups, weighted by num_base.
+
+    Small subsets (SIFT20k) get a single thread so nearly all cores stay on
+    the SIFT1M build, which is the critical path.
+    """
+
+    ncpu = NUM_CORES
+    total = sum(cfg["num_base"] for cfg in runs)
+    return [max(1, (ncpu * cfg["num_base"]) // total) for cfg in runs]
+
+
+def _load_sift(project_dir: Path, runs):
+    """Load SIFT base/query/groundtruth once, sized for the largest run."""
+
+    data_dir = project_dir / "data" / "SIFT1M" / "sift"
+    paths = {
+        "base": data_dir / "sift_base.fvecs",
+        "query": data_dir / "sift_query.fvecs",
+        "groundtruth": data_dir / "sift_groundtruth.ivecs",
+    }
+
+    max_base = max(cfg["num_base"] for cfg in runs)
+    max_queries = max(cfg["num_queries"] for cfg in runs)
+
+    print("[run_experiment0] loading SIFT base/queries from", data_dir)
+    base_all, query_all = chs.load_dataset(
+        str(paths["base"]), str(paths["query"]), max_base, max_queries, dim=128
+    )
+
+    gt_full = None
+    if any(cfg.get("use_groundtruth", True) for cfg in runs):
+        print("[run_experiment0] loading groundtruth from", paths["groundtruth"])
+        gt_full = chs.read_ivecs(str(paths["groundtruth"]))
+
+    return base_all, query_all, gt_full, paths
+
+
 def main() -> int:
-    script_path = Path(__file__).resolve()
-    experiment_dir = script_path.parent.parent
-    project_dir = experiment_dir.parent.parent
+    experiment_dir = EXPERIMENT_DIR
+    project_dir = PROJECT_DIR
 
+    # One entry per index build; ef_search values sweep over the same graph.
     runs = [
         {
-            "name": "sift20k_M24_efc300_efs256",
             "dataset": "SIFT20k",
             "num_base": 20000,
             "num_queries": 2000,
-            "ef_search": 256,
-            "use_groundtruth": False,
-        },
-        {
-            "name": "sift20k_M24_efc300_efs512",
-            "dataset": "SIFT20k",
-            "num_base": 20000,
-            "num_queries": 2000,
-            "ef_search": 512,
+            "M": 24,
+            "ef_construction": 300,
+            "ef_search_sweep": [256, 512],
             "use_groundtruth": False,
         },
         {
-            "name": "sift1m_M24_efc300_efs512",
             "dataset": "SIFT1M",
             "num_base": 1000000,
             "num_queries": 10000,
-            "ef_search": 512,
+            "M": 24,
+            "ef_construction": 300,
+            "ef_search_sweep": [512],
             "use_groundtruth": True,
         },
     ]
 
+    dataset = _load_sift(project_dir, runs)
+
+    # Groundtruth is resolved serially first: the brute-force matmul uses
+    # every BLAS thread, so it must not overlap a timed build.
+    prepared = [_prepare_group(cfg, dataset, experiment_dir) for cfg in runs]
+
+    # Builds are independent and hnswlib releases the GIL, so threads overlap
+    # the short SIFT20k build with the SIFT1M build while sharing the
+    # already-loaded arrays. Only the build_index calls run concurrently, so
+    # build times reflect the per-group thread split, recorded as
+    # build_threads.
+    threads = _thread_budget(runs)
+    built = [None] * len(runs)
+    with ThreadPoolExecutor(max_workers=len(runs)) as ex:
+        futures = {
+            ex.submit(_build_group, cfg, prep[0], n): i
+            for i, (cfg, prep, n) in enumerate(zip(runs, prepared, threads))
+        }
+        for fut in as_completed(futures):
+            i = futures[fut]
+            index, build_time = fut.result()
+            _base, queries, gt = prepared[i]
+            built[i] = (index, build_time, queries, gt)
+
+    # Start the sweeps from an empty temp log so re-runs do not duplicate
+    # rows; it is created only once every build succeeded and replaces
+    # RUNS_NDJSON after the last sweep.
+    out_dir = experiment_dir / "results" / "raw"
+    out_dir.mkdir(parents=True, exist_ok=True)
+    (out_dir / RUNS_NDJSON_TMP).write_bytes(b"")
+
+    # Sweeps run one group at a time after every build has finished, so no
+    # timed search overlaps a build or another sweep.
+    paths = dataset[3]
     results = []
-    for cfg in runs:
-        res = _run_one(cfg, project_dir, experiment_dir)
-        results.append(res)
+    try:
+        for cfg, n, group in zip(runs, threads, built):
+            results.extend(_search_group(cfg, group, paths, experiment_dir, n))
+    except BaseException:
+        (out_dir / RUNS_NDJSON_TMP).unlink(missing_ok=True)
+        raise
+    os.replace(out_dir / RUNS_NDJSON_TMP, out_dir / RUNS_NDJSON)
 
     print("\n=== Experiment 0: hnswlib summary ===")
     header = [
@@ -152,11 +307,12 @@ def main() -> int:
         "search_s",
     ]
     print("\t".join(header))
-    for r, cfg in zip(results, runs):
+    for r in results:
+        cfg = r["config"]
         agg = r["aggregate"]
         row = [
-            cfg["name"],
-            cfg["dataset"],
+            r["name"],
+            cfg["dataset_name"],
             str(cfg["num_base"]),
             str(cfg["num_queries"]),
             f"{agg['recall_at_k']:.6f}",
@@ -11,84 +11,314 @@ Usage (from experiment dir, inside WSL):
 """
 
 import argparse
-import json
+import mmap
+import os
 import sys
+from collections import defaultdict
+from itertools import groupby
+from operator import attrgetter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Iterator, NamedTuple, Optional, Tuple
 
-try:
-    import matplotlib
+# Shared analyzer helpers live in the project-level scripts/ directory.
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "scripts"))
 
-    matplotlib.use("Agg")
-    import matplotlib.pyplot as plt  # type: ignore
-    from matplotlib.ticker import FuncFormatter
+from analyze_common import fast_glob, load_sections  # noqa: E402
 
-    HAS_MPL = True
+try:
+    import msgspec  # type: ignore
+
+    HAS_MSGSPEC = True
 except Exception:  # pragma: no cover
-    HAS_MPL = False
+    HAS_MSGSPEC = False
 
 
-def load_results(paths: List[Path]) -> List[Dict[str, Any]]:
-    rows = []
-    for p in paths:
+# matplotlib (and numpy with it) is imported lazily by _ensure_mpl so runs
+# that never plot (no inputs, import errors) skip its startup cost.
+plt: Any = None
+FuncFormatter: Any = None
+np: Any = None
+HAS_MPL: Optional[bool] = None  # None until the first _ensure_mpl() call
+
+
+def _ensure_mpl() -> bool:
+    """Import matplotlib on first use and bind plt/FuncFormatter/np globals."""
+
+    global plt, FuncFormatter, np, HAS_MPL
+    if HAS_MPL is not None:
+        return HAS_MPL
+    try:
+        import matplotlib
+
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as _plt  # type: ignore
+        from matplotlib.ticker import FuncFormatter as _FuncFormatter
+        import numpy as _np  # matplotlib dependency; used for plot coordinates
+    except Exception:  # pragma: no cover
+        HAS_MPL = False
+        return False
+
+    # Cheaper Agg rendering of long polylines; the curves here are smooth
+    # sweeps, so simplification is not visible at the saved resolution.
+    _plt.rcParams.update(
+        {
+            "path.simplify": True,
+            "path.simplify_threshold": 1.0,
+            "agg.path.chunksize": 10000,
+        }
+    )
+    plt, FuncFormatter, np = _plt, _FuncFormatter, _np
+    HAS_MPL = True
+    return True
+
+
+if HAS_MSGSPEC:
+
+    # Typed schema for the fields _load_one reads. msgspec skips every other
+    # key (io, latency percentiles, per-query data) without building objects
+    # for it; absent fields decode as None, matching dict.get.
+    class _Cfg(msgspec.Struct):
+        num_queries: Optional[int] = None
+        vectors_per_block: Optional[int] = None
+        max_steps: Optional[int] = None
+        portal_degree: Optional[int] = None
+
+    class _Agg(msgspec.Struct):
+        k: Optional[int] = None
+        num_queries: Optional[int] = None
+        search_time_s: Optional[float] = None
+        build_time_s: Optional[float] = None
+        qps: Optional[float] = None
+        qps_search: Optional[float] = None
+        qps_total: Optional[float] = None
+        recall_at_k: Optional[float] = None
+        effective_qps: Optional[float] = None
+        avg_blocks_visited: Optional[float] = None
+        avg_distances_computed: Optional[float] = None
+        device_time_us: Optional[float] = None
+
+    class _Top(msgspec.Struct):
+        config: _Cfg = msgspec.field(default_factory=_Cfg)
+        aggregate: _Agg = msgspec.field(default_factory=_Agg)
+
+    _decode_top = msgspec.json.Decoder(_Top).decode
+
+
+@contextmanager
+def _mapped(p: Path) -> Iterator[memoryview]:
+    """Yield a read-only view of p's bytes backed by mmap (no read() copy)."""
+
+    with open(p, "rb") as f:
         try:
-            with p.open("r", encoding="utf-8") as f:
-                data = json.load(f)
-        except Exception as e:
-            print(f"[WARN] Failed to load {p}: {e}", file=sys.stderr)
-            continue
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file; let the decoder report it
+            yield memoryview(b"")
+            return
+        try:
+            with memoryview(mm) as view:
+                yield view
+        finally:
+            mm.close()
+
+
+def _load_sections(p: Path) -> Dict[str, Any]:
+    """Return just the top-level config/aggregate objects of a result JSON.
 
-        cfg = data.get("config", {})
-        agg = data.get("aggregate", {})
-
-        num_q = agg.get("num_queries") or cfg.get("num_queries") or 0
-        search_s = agg.get("search_time_s")
-        build_s = agg.get("build_time_s")
-
-        qps_search = agg.get("qps_search")
-        if qps_search is None and num_q and search_s is not None:
-            try:
-                s = float(search_s)
-                if s > 0.0:
-                    qps_search = float(num_q) / s
-            except Exception:
-                qps_search = None
-        if qps_search is None:
-            qps_search = agg.get("qps")
-
-        qps_total = agg.get("qps_total")
-        if qps_total is None and num_q and build_s is not None and search_s is not None:
-            try:
-                b = float(build_s)
-                s = float(search_s)
-                if (b + s) > 0.0:
-                    qps_total = float(num_q) / (b + s)
-            except Exception:
-                qps_total = None
-        if qps_total is None:
-            qps_total = agg.get("qps")
-
-        rows.append(
-            {
-                "file": p.name,
-                "Kpb": cfg.get("vectors_per_block"),
-                "max_steps": cfg.get("max_steps"),
-                "portal_degree": cfg.get("portal_degree"),
-                "k": agg.get("k"),
-                "num_queries": agg.get("num_queries"),
-                "recall_at_k": agg.get("recall_at_k"),
-                "qps_search": qps_search,
-                "qps_total": qps_total,
-                "effective_qps": agg.get("effective_qps"),
-                "avg_blocks_visited": agg.get("avg_blocks_visited"),
-                "avg_distances_computed": agg.get("avg_distances_computed"),
-                "device_time_us": agg.get("device_time_us"),
+    Prefers a typed msgspec decode straight from an mmap of the file; a log
+    whose values do not fit the schema, or a run without msgspec, falls
+    through to analyze_common.load_sections.
+    """
+
+    if HAS_MSGSPEC:
+        try:
+            with _mapped(p) as buf:
+                top = _decode_top(buf)
+        except msgspec.ValidationError:
+            pass
+        else:
+            return {
+                "config": msgspec.structs.asdict(top.config),
+                "aggregate": msgspec.structs.asdict(top.aggregate),
             }
-        )
-    return rows
+
+    return load_sections(p)
+
+
+class Row(NamedTuple):
+    """One Experiment 10 result file, flattened.
+
+    A NamedTuple keeps per-row memory to a fixed-size tuple (no per-instance
+    __dict__) and gives attribute access to the fields.
+    """
+
+    file: str
+    Kpb: Optional[int]
+    max_steps: Optional[int]
+    portal_degree: Optional[int]
+    k: Optional[int]
+    num_queries: Optional[int]
+    recall_at_k: Optional[float]
+    qps_search: Optional[float]
+    qps_total: Optional[float]
+    effective_qps: Optional[float]
+    avg_blocks_visited: Optional[float]
+    avg_distances_computed: Optional[float]
+    device_time_us: Optional[float]
+
+
+_NUMBER = (int, float)
+
+
+def _as_float(v: Any) -> Optional[float]:
+    try:
+        return None if v is None else float(v)
+    except (TypeError, ValueError):
+        return None
 
 
-def print_table(rows: List[Dict[str, Any]]) -> None:
+def _as_int(v: Any) -> Optional[int]:
+    try:
+        return None if v is None else int(v)
+    except (TypeError, ValueError):
+        return None
+
+
+# Source expression for each Row field, in Row field order. The names in
+# _ROW_ARGS are the values _load_one has already derived; everything else is
+# read straight from the config (cg) / aggregate (ag) getters.
+_ROW_ARGS = ("p", "cg", "ag", "num_queries", "qps_search", "qps_total")
+_ROW_SOURCES = (
+    ("file", "p.name"),
+    ("Kpb", 'cg("vectors_per_block")'),
+    ("max_steps", '_as_int(cg("max_steps"))'),
+    ("portal_degree", 'cg("portal_degree")'),
+    ("k", 'ag("k")'),
+    ("num_queries", "num_queries"),
+    ("recall_at_k", '_as_float(ag("recall_at_k"))'),
+    ("qps_search", "qps_search"),
+    ("qps_total", "qps_total"),
+    ("effective_qps", '_as_float(ag("effective_qps"))'),
+    ("avg_blocks_visited", 'ag("avg_blocks_visited")'),
+    ("avg_distances_computed", 'ag("avg_distances_computed")'),
+    ("device_time_us", 'ag("device_time_us")'),
+)
+assert tuple(name for name, _ in _ROW_SOURCES) == Row._fields
+
+
+def _compile_row_builder() -> Callable[..., Row]:
+    """Generate a flat, positional Row constructor for the fixed schema.
+
+    The generated body is a single tuple.__new__ call with every field read
+    inline, so building a row does no keyword matching or per-field loop.
+    """
+
+    body = ",\n        ".join(expr for _, expr in _ROW_SOURCES)
+    src = (
+        f"def _make_row({', '.join(_ROW_ARGS)}):\n"
+        f"    return _new(Row, (\n        {body},\n    ))\n"
+    )
+    namespace: Dict[str, Any] = {
+        "Row": Row,
+        "_new": tuple.__new__,
+        "_as_int": _as_int,
+        "_as_float": _as_float,
+    }
+    exec(compile(src, "<exp10 row builder>", "exec"), namespace)
+    return namespace["_make_row"]
+
+
+_make_row = _compile_row_builder()
+
+
+def _load_one(p: Path) -> Optional[Row]:
+    """Parse one result file into a row, or None if it cannot be loaded."""
+
+    try:
+        data = _load_sections(p)
+    except Exception as e:
+        print(f"[WARN] Failed to load {p}: {e}", file=sys.stderr)
+        return None
+
+    cfg = data.get("config", {})
+    agg = data.get("aggregate", {})
+    # Bind each field once; several (num_queries, qps) feed more than one column.
+    cg = cfg.get
+    ag = agg.get
+
+    num_queries = ag("num_queries")
+    num_q = num_queries or cg("num_queries") or 0
+    search_s = ag("search_time_s")
+    build_s = ag("build_time_s")
+    qps = ag("qps")
+
+    # JSON numbers arrive as int/float, so type checks replace try/float();
+    # anything else (missing or malformed) falls back to the logged qps.
+    have_n = num_q and isinstance(num_q, _NUMBER)
+    have_search = isinstance(search_s, _NUMBER)
+
+    qps_search = ag("qps_search")
+    if qps_search is None and have_n and have_search and search_s > 0.0:
+        qps_search = num_q / search_s
+    if qps_search is None:
+        qps_search = qps
+
+    qps_total = ag("qps_total")
+    if qps_total is None and have_n and have_search and isinstance(build_s, _NUMBER):
+        total_s = build_s + search_s
+        if total_s > 0.0:
+            qps_total = num_q / total_s
+    if qps_total is None:
+        qps_total = qps
+
+    return _make_row(p, cg, ag, num_queries, qps_search, qps_total)
+
+
+def load_results(paths: List[Path], use_processes: bool = False) -> List[Row]:
+    """Load rows for all paths concurrently, preserving input order.
+
+    Threads overlap file I/O; use_processes switches to a process pool for
+    CPU-bound parsing of very large logs.
+    """
+
+    if not paths:
+        return []
+    if use_processes:
+        executor = ProcessPoolExecutor()
+    else:
+        executor = ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4))
+    with executor as ex:
+        loaded = list(ex.map(_load_one, paths))
+    return [r for r in loaded if r is not None]
+
+
+# (Row field, format spec) per summary column. Unformatted fields print via
+# str() (None -> "None"); formatted metrics print "" when missing.
+_TABLE_FIELDS = (
+    ("file", ""),
+    ("Kpb", ""),
+    ("max_steps", ""),
+    ("portal_degree", ""),
+    ("recall_at_k", ".4f"),
+    ("qps_search", ".1f"),
+    ("qps_total", ".1f"),
+    ("effective_qps", ".1f"),
+    ("avg_blocks_visited", ".1f"),
+)
+_TABLE_SPECS = tuple(spec for _, spec in _TABLE_FIELDS)
+_table_values = attrgetter(*(key for key, _ in _TABLE_FIELDS))
+
+
+def _format_table_row(r: Row) -> str:
+    return "\t".join(
+        "" if v is None and spec else format(v, spec)
+        for v, spec in zip(_table_values(r), _TABLE_SPECS)
+    )
+
+
+def print_table(rows: List[Row]) -> None:
     if not rows:
         print("No results to show.")
         return
@@ -105,27 +335,46 @@ def print_table(rows: List[Dict[str, Any]]) -> None:
         "avg_blocks",
     ]
 
-    print("\n=== Experiment 10 Summary ===")
-    print("\t".join(headers))
-    for r in sorted(rows, key=lambda x: (x["Kpb"], x["max_steps"], x["portal_degree"])):
-        print(
-            "\t".join(
-                [
-                    str(r["file"]),
-                    str(r["Kpb"]),
-                    str(r["max_steps"]),
-                    str(r["portal_degree"]),
-                    f"{r['recall_at_k']:.4f}" if r["recall_at_k"] is not None else "",
-                    f"{r['qps_search']:.1f}" if r["qps_search"] is not None else "",
-                    f"{r['qps_total']:.1f}" if r["qps_total"] is not None else "",
-                    f"{r['effective_qps']:.1f}" if r["effective_qps"] is not None else "",
-                    f"{r['avg_blocks_visited']:.1f}" if r["avg_blocks_visited"] is not None else "",
-                ]
-            )
-        )
+    # Build the whole table and emit it with one write instead of a print
+    # (and potential flush) per row.
+    lines = ["\n=== Experiment 10 Summary ===", "\t".join(headers)]
+    lines.extend(
+        _format_table_row(r)
+        for r in sorted(rows, key=attrgetter("Kpb", "max_steps", "portal_degree"))
+    )
+    sys.stdout.write("\n".join(lines) + "\n")
+
+
+def to_columns(rows: List[Row]) -> Dict[str, List[Any]]:
+    """Column-major (SoA) view of the rows that carry recall and effective_qps.
+
+    Metrics are already floats (coerced in _load_one), so consumers can scan
+    plain lists; "row" maps each column position back to its index in rows.
+    """
+
+    cols: Dict[str, List[Any]] = {
+        "row": [],
+        "Kpb": [],
+        "max_steps": [],
+        "portal_degree": [],
+        "recall_at_k": [],
+        "effective_qps": [],
+    }
+    for i, r in enumerate(rows):
+        rec = r.recall_at_k
+        q = r.effective_qps
+        if rec is None or q is None:
+            continue
+        cols["row"].append(i)
+        cols["Kpb"].append(r.Kpb)
+        cols["max_steps"].append(r.max_steps)
+        cols["portal_degree"].append(r.portal_degree)
+        cols["recall_at_k"].append(rec)
+        cols["effective_qps"].append(q)
+    return cols
 
 
-def print_recall_matched(rows: List[Dict[str, Any]]) -> None:
+def print_recall_matched(rows: List[Row]) -> None:
     if not rows:
         return
 
@@ -134,20 +383,19 @@ def print_recall_matched(rows: List[Dict[str, Any]]) -> None:
     print("\n=== Experiment 10 Recall-Matched Summary (max effective_qps) ===")
     print("\t".join(headers))
 
+    cols = to_columns(rows)
+    recs = cols["recall_at_k"]
+    qpss = cols["effective_qps"]
+
+    # One O(n log n) sort by effective_qps (descending, stable so ties keep
+    # file order); each target then takes the first position meeting it.
+    by_qps = sorted(range(len(qpss)), key=qpss.__getitem__, reverse=True)
+
     for t in targets:
         best = None
-        for r in rows:
-            rec = r.get("recall_at_k")
-            q = r.get("effective_qps")
-            if rec is None or q is None:
-                continue
-            try:
-                if float(rec) < float(t):
-                    continue
-            except Exception:
-                continue
-            if best is None or float(q) > float(best.get("effective_qps") or 0.0):
-                best = r
+        hit = next((i for i in by_qps if recs[i] >= t), None)
+        if hit is not None:
+            best = rows[cols["row"][hit]]
 
         if best is None:
             print("\t".join([f"{t:.2f}", "", "", "", "", "", ""]))
@@ -156,19 +404,24 @@ def print_recall_matched(rows: List[Dict[str, Any]]) -> None:
                 "\t".join(
                     [
                         f"{t:.2f}",
-                        str(best.get("Kpb")),
-                        str(best.get("max_steps")),
-                        str(best.get("portal_degree")),
-                        f"{float(best['recall_at_k']):.4f}",
-                        f"{float(best['effective_qps']):.1f}",
-                        str(best.get("file") or ""),
+                        str(best.Kpb),
+                        str(best.max_steps),
+                        str(best.portal_degree),
+                        f"{best.recall_at_k:.4f}",
+                        f"{best.effective_qps:.1f}",
+                        str(best.file or ""),
                     ]
                 )
             )
 
 
+@lru_cache(maxsize=512)
 def _format_k(value: Any) -> str:
-    """Format a numeric value using a compact k-suffix when appropriate."""
+    """Format a numeric value using a compact k-suffix when appropriate.
+
+    Cached: FuncFormatter calls this for every tick on every redraw, and the
+    same tick values recur across all figures.
+    """
 
     if value is None:
         return ""
@@ -190,290 +443,342 @@ def _k_formatter(x: float, _pos) -> str:
     return _format_k(x)
 
 
-def make_plots(rows: List[Dict[str, Any]], out_dir: Path) -> None:
-    if not HAS_MPL:
-        print("[INFO] matplotlib not available; skipping plots.")
-        return
-    if not rows:
-        return
+def _step_sort_key(ms: int) -> tuple:
+    """Order max_steps by work, with 0 (full scan) last."""
 
-    out_dir.mkdir(parents=True, exist_ok=True)
+    v = int(ms)
+    return (v == 0, v)
 
-    def _plot_for_subset(sub_rows: List[Dict[str, Any]], P: int, suffix: str) -> None:
-        if not sub_rows:
-            return
 
-        # Filter rows that have the metrics required for plotting.
-        valid_rows = [
-            r
-            for r in sub_rows
-            if r.get("max_steps") is not None
-            and r.get("effective_qps") is not None
-            and r.get("recall_at_k") is not None
-        ]
-        if not valid_rows:
-            return
+def _plot_qps_recall_vs_steps(
+    groups: List[Tuple[int, List[Row]]], P: int, suffix: str, out_path: Path
+) -> None:
+    """Effective QPS and recall vs max_steps, one curve pair per (Kpb, rows) group."""
 
-        # Build a consistent ordering of max_steps values for this subset,
-        # treating max_steps == 0 as a "full scan" configuration that should
-        # appear at the *right* of the axis even though its numeric value is 0.
-        # We preserve approximate spacing in terms of the underlying step
-        # counts by mapping full-scan to a position slightly beyond the largest
-        # nonzero max_steps.
-        def _step_sort_key(ms: int) -> tuple:
-            v = int(ms)
-            return (v == 0, v)
-
-        step_values = {int(r["max_steps"] or 0) for r in valid_rows}
-        has_full = 0 in step_values
-        nonzero_steps = sorted(s for s in step_values if s != 0)
-        max_nonzero = nonzero_steps[-1] if nonzero_steps else 1
-
-        def _to_x(ms: int) -> float:
-            v = int(ms)
-            if v == 0 and has_full:
-                # Place full-scan slightly to the right of the largest
-                # nonzero step so lines connect monotonically along the
-                # horizontal axis while visually indicating "max work".
-                return float(max_nonzero) * 1.05
-            return float(v)
-
-        unique_steps = sorted(step_values, key=_step_sort_key)
-        step_to_x = {ms: _to_x(ms) for ms in unique_steps}
-
-        # For the main P=1/2/4 plots, use two vertically stacked subplots so
-        # effective QPS and recall each get their own y-axis. For the dense
-        # K=128 sweep (suffix "_K128"), keep a dual-axis layout but still share
-        # consistent x-axis semantics.
+    if not groups or not _ensure_mpl():
+        return
+
+    # Single pass over the subset: per-point columns for the curves plus the
+    # max_steps -> avg_blocks_visited map used for the K=128 tick labels.
+    # Groups are contiguous and already ordered, so each curve below is a
+    # slice of these columns.
+    ms_col: List[int] = []
+    qps_col: List[float] = []
+    rec_col: List[float] = []
+    blocks_by_step: Dict[int, float] = {}
+    for _, subK in groups:
+        for r in subK:
+            ms = r.max_steps
+            ms_col.append(ms)
+            qps_col.append(r.effective_qps)
+            rec_col.append(r.recall_at_k)
+            ab = _as_float(r.avg_blocks_visited)
+            if ab is not None:
+                blocks_by_step[ms] = ab
+
+    # Build a consistent ordering of max_steps values for this subset,
+    # treating max_steps == 0 as a "full scan" configuration that should
+    # appear at the *right* of the axis even though its numeric value is 0.
+    # We preserve approximate spacing in terms of the underlying step
+    # counts by mapping full-scan to a position slightly beyond the largest
+    # nonzero max_steps.
+    step_values = set(ms_col)
+    steps_sorted = sorted(step_values)
+    has_full = steps_sorted[0] == 0
+    max_nonzero = steps_sorted[-1] if steps_sorted[-1] != 0 else 1
+
+    def _to_x(ms: int) -> float:
+        v = int(ms)
+        if v == 0 and has_full:
+            # Place full-scan slightly to the right of the largest
+            # nonzero step so lines connect monotonically along the
+            # horizontal axis while visually indicating "max work".
+            return float(max_nonzero) * 1.05
+        return float(v)
+
+    unique_steps = sorted(step_values, key=_step_sort_key)
+    step_to_x = {ms: _to_x(ms) for ms in unique_steps}
+
+    # Map max_steps -> x with a single searchsorted gather.
+    ms_arr = np.array(ms_col, dtype=np.int64)
+    qps_arr = np.array(qps_col, dtype=np.float64)
+    rec_arr = np.array(rec_col, dtype=np.float64)
+    steps_num = np.array(steps_sorted, dtype=np.int64)
+    x_table = np.array([step_to_x[ms] for ms in steps_num.tolist()], dtype=np.float64)
+    x_arr = x_table[np.searchsorted(steps_num, ms_arr)]
+
+    # For the main P=1/2/4 plots, use two vertically stacked subplots so
+    # effective QPS and recall each get their own y-axis. For the dense
+    # K=128 sweep (suffix "_K128"), keep a dual-axis layout but still share
+    # consistent x-axis semantics.
+    if suffix == "_K128":
+        fig, ax_qps = plt.subplots(figsize=(8, 4), layout="constrained")
+        ax_rec = ax_qps.twinx()
+    else:
+        fig, (ax_qps, ax_rec) = plt.subplots(
+            2, 1, sharex=True, figsize=(8, 6), layout="constrained"
+        )
+
+    handles = []
+    labels = []
+
+    # Autoscale once after all curves are added rather than on every plot().
+    ax_qps.set_autoscale_on(False)
+    ax_rec.set_autoscale_on(False)
+
+    start = 0
+    for Kpb, subK in groups:
+        # Groups are already in increasing work order, with the full-scan
+        # configuration (max_steps=0) last, so lines connect in order.
+        run = slice(start, start + len(subK))
+        start = run.stop
+        xs = x_arr[run]
+        ys_qps = qps_arr[run]
+        ys_rec = rec_arr[run]
+
+        # For the dense K=128 sweep plot (suffix '_K128'), fix colors so
+        # QPS and recall are visually distinct. For other plots, reuse the
+        # color for both curves of a given Kpb.
         if suffix == "_K128":
-            fig, ax_qps = plt.subplots(figsize=(8, 4))
-            ax_rec = ax_qps.twinx()
+            qps_color = "C0"
+            rec_color = "C1"
         else:
-            fig, (ax_qps, ax_rec) = plt.subplots(2, 1, sharex=True, figsize=(8, 6))
+            qps_color = None
+            rec_color = None
+
+        line_qps, = ax_qps.plot(
+            xs,
+            ys_qps,
+            marker="o",
+            color=qps_color,
+            label=f"K={Kpb} eff_qps",
+        )
+        if rec_color is None:
+            rec_color = line_qps.get_color()
+        line_rec, = ax_rec.plot(
+            xs,
+            ys_rec,
+            marker="s",
+            linestyle="--",
+            color=rec_color,
+            label=f"K={Kpb} recall",
+        )
+        handles.extend([line_qps, line_rec])
+        labels.extend([f"K={Kpb} eff_qps", f"K={Kpb} recall"])
 
-        handles = []
-        labels = []
+    for a in (ax_qps, ax_rec):
+        a.set_autoscale_on(True)
+        a.relim()
+        a.autoscale_view()
 
-        for Kpb in sorted({r["Kpb"] for r in valid_rows}):
-            subK = [r for r in valid_rows if r["Kpb"] == Kpb]
-            if not subK:
-                continue
+    if suffix == "_K128":
+        ax_qps.set_xlabel("Max Steps (approx. % of full-scan blocks)")
+    else:
+        ax_rec.set_xlabel("Max Steps")
 
-            # Ensure that lines connect points in increasing work order,
-            # with the full-scan configuration (max_steps=0) appearing last.
-            subK_sorted = sorted(
-                subK, key=lambda r: _step_sort_key(int(r["max_steps"] or 0))
-            )
+    ax_qps.set_ylabel("Effective QPS")
+    ax_rec.set_ylabel("Recall @ k")
 
-            xs = [step_to_x[int(r["max_steps"] or 0)] for r in subK_sorted]
-            ys_qps = [float(r["effective_qps"]) for r in subK_sorted]
-            ys_rec = [float(r["recall_at_k"]) for r in subK_sorted]
+    ax_qps.yaxis.set_major_formatter(FuncFormatter(_k_formatter))
+    ax_rec.set_ylim(0.0, 1.05)
 
-            # For the dense K=128 sweep plot (suffix '_K128'), fix colors so
-            # QPS and recall are visually distinct. For other plots, reuse the
-            # color for both curves of a given Kpb.
-            if suffix == "_K128":
-                qps_color = "C0"
-                rec_color = "C1"
+    ax_qps.set_title(
+        f"Experiment 10: Effective QPS and Recall vs Max Steps\n(P={P}{suffix})"
+    )
+    ax_qps.grid(True, linestyle="--", alpha=0.3)
+
+    # For the K=128 sweep plot, annotate a subset of x ticks with percentage
+    # of full-scan blocks using avg_blocks_visited at max_steps=0 as the
+    # baseline, and label the full-scan configuration explicitly.
+    if suffix == "_K128":
+        full_blocks = None
+        if 0 in blocks_by_step and blocks_by_step[0] > 0.0:
+            full_blocks = blocks_by_step[0]
+        else:
+            # Fallback: use the maximum observed avg_blocks_visited as an
+            # approximation of full-scan.
+            if blocks_by_step:
+                full_blocks = max(blocks_by_step.values())
+
+        if full_blocks and full_blocks > 0.0:
+            xs_all = sorted(blocks_by_step.keys(), key=_step_sort_key)
+            # Subsample ticks to avoid overcrowding: aim for at most ~10
+            # labeled positions including the smallest step and full scan.
+            if len(xs_all) > 10:
+                step = max(1, len(xs_all) // 10)
+                xs_ticks = xs_all[::step]
+                if xs_all[-1] not in xs_ticks:
+                    xs_ticks.append(xs_all[-1])
+                xs_ticks = sorted(set(xs_ticks), key=_step_sort_key)
             else:
-                qps_color = None
-                rec_color = None
-
-            line_qps, = ax_qps.plot(
-                xs,
-                ys_qps,
-                marker="o",
-                color=qps_color,
-                label=f"K={Kpb} eff_qps",
-            )
-            if rec_color is None:
-                rec_color = line_qps.get_color()
-            line_rec, = ax_rec.plot(
-                xs,
-                ys_rec,
-                marker="s",
-                linestyle="--",
-                color=rec_color,
-                label=f"K={Kpb} recall",
-            )
-            handles.extend([line_qps, line_rec])
-            labels.extend([f"K={Kpb} eff_qps", f"K={Kpb} recall"])
-
+                xs_ticks = xs_all
+
+            tick_positions = [step_to_x[ms] for ms in xs_ticks]
+            tick_labels = []
+            for ms in xs_ticks:
+                frac = blocks_by_step[ms] / full_blocks
+                pct = int(round(frac * 100))
+                if ms == 0:
+                    tick_labels.append(f"full\n{pct}%")
+                else:
+                    tick_labels.append(f"{ms}\n{pct}%")
+            ax_qps.set_xticks(tick_positions)
+            ax_qps.set_xticklabels(tick_labels, fontsize=7)
+    else:
+        # Generic plots: label the x-axis categories by max_steps, with a
+        # special label for the full-scan configuration.
+        xticks = [step_to_x[ms] for ms in unique_steps]
+        tick_labels = ["full" if ms == 0 else str(ms) for ms in unique_steps]
+        ax_rec.set_xticks(xticks)
+        ax_rec.set_xticklabels(tick_labels, rotation=0, ha="center", fontsize=8)
+
+    if handles:
         if suffix == "_K128":
-            ax_qps.set_xlabel("Max Steps (approx. % of full-scan blocks)")
+            # Move legend above the plot area to avoid overlapping lines.
+            ax_qps.legend(
+                handles,
+                labels,
+                loc="upper center",
+                bbox_to_anchor=(0.5, 0.98),
+                ncol=2,
+                fontsize=8,
+            )
         else:
-            ax_rec.set_xlabel("Max Steps")
+            ax_qps.legend(handles, labels, loc="best", fontsize=8)
+
+    fig.savefig(out_path, dpi=150)
+    plt.close(fig)
 
-        ax_qps.set_ylabel("Effective QPS")
-        ax_rec.set_ylabel("Recall @ k")
 
-        ax_qps.yaxis.set_major_formatter(FuncFormatter(_k_formatter))
-        ax_rec.set_ylim(0.0, 1.05)
+def _plot_recall_vs_qps(groups: List[Tuple[int, List[Row]]], P: int, out_path: Path) -> None:
+    """Recall vs effective QPS, one curve per (Kpb, rows) group."""
 
-        ax_qps.set_title(
-            f"Experiment 10: Effective QPS and Recall vs Max Steps\n(P={P}{suffix})"
+    if not _ensure_mpl():
+        return
+
+    fig, ax = plt.subplots(figsize=(7, 4), layout="constrained")
+
+    handles = []
+    labels = []
+
+    ax.set_autoscale_on(False)
+
+    for Kpb, subK in groups:
+        xs = [r.effective_qps for r in subK]
+        ys = [r.recall_at_k for r in subK]
+
+        line, = ax.plot(
+            xs,
+            ys,
+            marker="o",
+            label=f"K={Kpb}",
         )
-        ax_qps.grid(True, linestyle="--", alpha=0.3)
+        handles.append(line)
+        labels.append(f"K={Kpb}")
+
+        # Max-steps annotations are disabled to keep the plot uncluttered;
+        # max_steps trends are conveyed via the separate QPS-vs-max_steps
+        # figures for P=1/2/4.
+
+    ax.set_autoscale_on(True)
+    ax.relim()
+    ax.autoscale_view()
+
+    ax.set_xlabel("Effective QPS")
+    ax.set_ylabel("Recall @ k")
+    ax.xaxis.set_major_formatter(FuncFormatter(_k_formatter))
+    ax.set_ylim(0.0, 1.05)
+    ax.grid(True, alpha=0.3)
+    ax.set_title(
+        f"Experiment 10: Recall vs Effective QPS\n(P={P})"
+    )
 
-        # For the K=128 sweep plot, annotate a subset of x ticks with percentage
-        # of full-scan blocks using avg_blocks_visited at max_steps=0 as the
-        # baseline, and label the full-scan configuration explicitly.
-        if suffix == "_K128":
-            # Map max_steps -> avg_blocks_visited for this subset
-            blocks_by_step = {}
-            for r in valid_rows:
-                ms = r.get("max_steps")
-                ab = r.get("avg_blocks_visited")
-                if ms is None or ab is None:
-                    continue
-                try:
-                    ms_i = int(ms)
-                    blocks_by_step[ms_i] = float(ab)
-                except Exception:
-                    continue
-
-            full_blocks = None
-            if 0 in blocks_by_step and blocks_by_step[0] > 0.0:
-                full_blocks = blocks_by_step[0]
-            else:
-                # Fallback: use the maximum observed avg_blocks_visited as an
-                # approximation of full-scan.
-                if blocks_by_step:
-                    full_blocks = max(blocks_by_step.values())
-
-            if full_blocks and full_blocks > 0.0:
-                xs_all = sorted(blocks_by_step.keys(), key=_step_sort_key)
-                # Subsample ticks to avoid overcrowding: aim for at most ~10
-                # labeled positions including the smallest step and full scan.
-                if len(xs_all) > 10:
-                    step = max(1, len(xs_all) // 10)
-                    xs_ticks = xs_all[::step]
-                    if xs_all[-1] not in xs_ticks:
-                        xs_ticks.append(xs_all[-1])
-                    xs_ticks = sorted(set(xs_ticks), key=_step_sort_key)
-                else:
-                    xs_ticks = xs_all
-
-                tick_positions = [step_to_x[ms] for ms in xs_ticks]
-                tick_labels = []
-                for ms in xs_ticks:
-                    frac = blocks_by_step[ms] / full_blocks
-                    pct = int(round(frac * 100))
-                    if ms == 0:
-                        tick_labels.append(f"full\n{pct}%")
-                    else:
-                        tick_labels.append(f"{ms}\n{pct}%")
-                ax_qps.set_xticks(tick_positions)
-                ax_qps.set_xticklabels(tick_labels, fontsize=7)
-        else:
-            # Generic plots: label the x-axis categories by max_steps, with a
-            # special label for the full-scan configuration.
-            xticks = [step_to_x[ms] for ms in unique_steps]
-            tick_labels = ["full" if ms == 0 else str(ms) for ms in unique_steps]
-            ax_rec.set_xticks(xticks)
-            ax_rec.set_xticklabels(tick_labels, rotation=0, ha="center", fontsize=8)
-
-        if handles:
-            if suffix == "_K128":
-                # Move legend above the plot area to avoid overlapping lines.
-                ax_qps.legend(
-                    handles,
-                    labels,
-                    loc="upper center",
-                    bbox_to_anchor=(0.5, 0.98),
-                    ncol=2,
-                    fontsize=8,
-                )
-            else:
-                ax_qps.legend(handles, labels, loc="best", fontsize=8)
+    if handles:
+        ax.legend(handles, labels, loc="best", fontsize=8)
 
-        fig.tight_layout()
-        fig.savefig(out_dir / f"exp10_qps_recall_vs_max_steps_P{P}{suffix}.png", dpi=150)
-        plt.close(fig)
+    fig.savefig(out_path, dpi=150)
+    plt.close(fig)
 
-    portal_degrees = sorted({r["portal_degree"] for r in rows if r.get("portal_degree") is not None})
-    for P in portal_degrees:
-        sub = [r for r in rows if r["portal_degree"] == P]
-        if not sub:
+
+# Output formats for --format. PNG stays the default (the READMEs link the
+# .png files); WebP (lossless, via Pillow) and SVG encode faster and smaller
+# for throwaway diagnostic sweeps.
+PLOT_FORMATS = ("png", "webp", "svg")
+
+
+def make_plots(rows: List[Row], out_dir: Path, fmt: str = "png") -> None:
+    if not rows:
+        return
+    if not _ensure_mpl():
+        print("[INFO] matplotlib not available; skipping plots.")
+        return
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    # Index plottable rows by portal degree, then sort each P once by
+    # (Kpb, work order) so every (P, Kpb) group is a contiguous, already
+    # ordered slice and the plot loops never rescan or re-sort rows.
+    by_P: Dict[int, List[Row]] = defaultdict(list)
+    for r in rows:
+        if (
+            r.portal_degree is None
+            or r.max_steps is None
+            or r.effective_qps is None
+            or r.recall_at_k is None
+        ):
             continue
+        by_P[r.portal_degree].append(r)
+
+    by_P_K: Dict[Tuple[int, int], List[Row]] = {}
+    kpbs_by_P: Dict[int, List[int]] = {}
+    for P, sub in by_P.items():
+        sub.sort(key=lambda r: (r.Kpb, _step_sort_key(r.max_steps)))
+        kpbs_by_P[P] = []
+        for Kpb, grp in groupby(sub, key=attrgetter("Kpb")):
+            by_P_K[(P, Kpb)] = list(grp)
+            kpbs_by_P[P].append(Kpb)
+
+    # Every figure is independent, so collect them as (function, args) tasks
+    # over picklable rows and render them in parallel below.
+    tasks: List[Tuple[Callable[..., None], tuple]] = []
+    portal_degrees = sorted(by_P)
+    for P in portal_degrees:
+        groups = [(K, by_P_K[(P, K)]) for K in kpbs_by_P[P]]
+        name = f"exp10_qps_recall_vs_max_steps_P{P}"
 
         # For P=2, split Kpb=128 (100k sweep) into its own plot to avoid clutter
         # and keep comparison plots focused.
         if P == 2:
-            sub_k128 = [r for r in sub if r.get("Kpb") == 128]
-            sub_other = [r for r in sub if r.get("Kpb") != 128]
-
-            if sub_other:
-                _plot_for_subset(sub_other, P, "")
-            if sub_k128:
-                _plot_for_subset(sub_k128, P, "_K128")
+            other = [g for g in groups if g[0] != 128]
+            k128 = [g for g in groups if g[0] == 128]
+            if other:
+                tasks.append((_plot_qps_recall_vs_steps, (other, P, "", out_dir / f"{name}.{fmt}")))
+            if k128:
+                tasks.append(
+                    (_plot_qps_recall_vs_steps, (k128, P, "_K128", out_dir / f"{name}_K128.{fmt}"))
+                )
         else:
-            _plot_for_subset(sub, P, "")
+            tasks.append((_plot_qps_recall_vs_steps, (groups, P, "", out_dir / f"{name}.{fmt}")))
 
     # Additional plots: recall vs effective QPS per portal degree, with each
     # point labeled by max_steps. Treat max_steps == 0 (full scan) as the
     # highest-work configuration and place it at the end of each curve.
     for P in portal_degrees:
-        subP = [
-            r
-            for r in rows
-            if r.get("portal_degree") == P
-            and r.get("effective_qps") is not None
-            and r.get("recall_at_k") is not None
-            and r.get("max_steps") is not None
-        ]
-        if not subP:
-            continue
-
-        fig, ax = plt.subplots(figsize=(7, 4))
-
-        def _step_sort_key(ms: int) -> tuple:
-            v = int(ms)
-            return (v == 0, v)
-
-        handles = []
-        labels = []
-
-        for Kpb in sorted({r["Kpb"] for r in subP}):
-            subK = [r for r in subP if r["Kpb"] == Kpb]
-            if not subK:
-                continue
-
-            subK_sorted = sorted(
-                subK, key=lambda r: _step_sort_key(int(r["max_steps"] or 0))
-            )
-            xs = [float(r["effective_qps"]) for r in subK_sorted]
-            ys = [float(r["recall_at_k"]) for r in subK_sorted]
-            steps = [int(r["max_steps"] or 0) for r in subK_sorted]
-
-            line, = ax.plot(
-                xs,
-                ys,
-                marker="o",
-                label=f"K={Kpb}",
-            )
-            handles.append(line)
-            labels.append(f"K={Kpb}")
-
-            # Max-steps annotations are disabled to keep the plot uncluttered;
-            # max_steps trends are conveyed via the separate QPS-vs-max_steps
-            # figures for P=1/2/4.
-
-        ax.set_xlabel("Effective QPS")
-        ax.set_ylabel("Recall @ k")
-        ax.xaxis.set_major_formatter(FuncFormatter(_k_formatter))
-        ax.set_ylim(0.0, 1.05)
-        ax.grid(True, alpha=0.3)
-        ax.set_title(
-            f"Experiment 10: Recall vs Effective QPS\n(P={P})"
-        )
-
-        if handles:
-            ax.legend(handles, labels, loc="best", fontsize=8)
+        groups = [(K, by_P_K[(P, K)]) for K in kpbs_by_P[P]]
+        out_path = out_dir / f"exp10_recall_vs_effective_qps_P{P}.{fmt}"
+        tasks.append((_plot_recall_vs_qps, (groups, P, out_path)))
+
+    # Rasterizing and saving is CPU-bound per figure; a couple of figures are
+    # not worth the pool startup.
+    if len(tasks) <= 2:
+        for fn, fn_args in tasks:
+            fn(*fn_args)
+        return
 
-        fig.tight_layout()
-        fig.savefig(out_dir / f"exp10_recall_vs_effective_qps_P{P}.png", dpi=150)
-        plt.close(fig)
+    workers = min(len(tasks), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        for fut in [ex.submit(fn, *fn_args) for fn, fn_args in tasks]:
+            fut.result()
 
 
 def main() -> int:
@@ -487,23 +792,37 @@ def main() -> int:
             "directory (default: results/raw/*.json)"
         ),
     )
+    parser.add_argument(
+        "--processes",
+        action="store_true",
+        help="Parse result files in a process pool instead of threads",
+    )
+    parser.add_argument(
+        "--format",
+        choices=PLOT_FORMATS,
+        default="png",
+        help="Plot file format (default: png; webp needs Pillow)",
+    )
     args = parser.parse_args()
 
     script_path = Path(__file__).resolve()
     exp_dir = script_path.parent.parent
 
     pattern = args.glob or "results/raw/*.json"
-    paths = sorted(exp_dir.glob(pattern))
+    if args.glob is None:
+        paths = fast_glob(exp_dir / "results" / "raw", "", ".json")
+    else:
+        paths = sorted(exp_dir.glob(pattern))
     if not paths:
         print(f"No JSON files found for pattern: {exp_dir / pattern}")
         return 0
 
-    rows = load_results(paths)
+    rows = load_results(paths, use_processes=args.processes)
     print_table(rows)
     print_recall_matched(rows)
 
     plots_dir = exp_dir / "results" / "plots"
-    make_plots(rows, plots_dir)
+    make_plots(rows, plots_dir, fmt=args.format)
 
     return 0
 
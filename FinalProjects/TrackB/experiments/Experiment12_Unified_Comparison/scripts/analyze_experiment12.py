@@ -1,8 +1,16 @@
 #!/usr/bin/env python3
 import argparse
-import json
+import bisect
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+# Shared analyzer helpers live in the project-level scripts/ directory.
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "scripts"))
+
+from analyze_common import fast_glob, load_sections  # noqa: E402
 
 try:
     import matplotlib
@@ -16,151 +24,236 @@ except Exception:
     HAS_MPL = False
 
 
-def _load(paths: List[Path]) -> List[Dict[str, Any]]:
-    rows: List[Dict[str, Any]] = []
-    for p in paths:
-        try:
-            data = json.loads(p.read_text(encoding="utf-8"))
-        except Exception:
-            continue
-        cfg = data.get("config", {})
-        agg = data.get("aggregate", {})
+class Row(NamedTuple):
+    """One Experiment 12 result file, flattened (fixed fields, no per-row dict)."""
 
-        num_q = agg.get("num_queries") or cfg.get("num_queries") or 0
-        search_s = agg.get("search_time_s")
-        build_s = agg.get("build_time_s")
+    file: str
+    dataset: Optional[str]
+    num_vectors: Optional[int]
+    mode: Optional[str]
+    hardware_level: Optional[str]
+    simulation_mode: Optional[str]
+    cache_capacity: Optional[int]
+    search_threads: Optional[int]
+    recall_at_k: Optional[float]
+    effective_qps: Optional[float]
+    qps_search: Optional[float]
+    qps_total: Optional[float]
+    p50: Optional[float]
+    p95: Optional[float]
+    p99: Optional[float]
+    label: str = ""  # filled from _label() by _load_one
 
-        qps_search = agg.get("qps_search")
-        if qps_search is None and num_q and search_s is not None:
-            try:
-                s = float(search_s)
-                if s > 0.0:
-                    qps_search = float(num_q) / s
-            except Exception:
-                qps_search = None
-        if qps_search is None:
-            qps_search = agg.get("qps")
 
-        qps_total = agg.get("qps_total")
-        if qps_total is None and num_q and build_s is not None and search_s is not None:
-            try:
-                b = float(build_s)
-                s = float(search_s)
-                if (b + s) > 0.0:
-                    qps_total = float(num_q) / (b + s)
-            except Exception:
-                qps_total = None
-        if qps_total is None:
-            qps_total = agg.get("qps")
-
-        mode = cfg.get("mode")
-        if mode is None and cfg.get("hardware_level") is not None:
-            mode = "ann_ssd"
-
-        rows.append(
-            {
-                "file": p.name,
-                "dataset": cfg.get("dataset_name"),
-                "num_vectors": cfg.get("num_vectors"),
-                "mode": mode,
-                "hardware_level": cfg.get("hardware_level"),
-                "simulation_mode": cfg.get("simulation_mode"),
-                "cache_capacity": cfg.get("cache_capacity"),
-                "recall_at_k": agg.get("recall_at_k"),
-                "effective_qps": agg.get("effective_qps"),
-                "qps_search": qps_search,
-                "qps_total": qps_total,
-                "p50": agg.get("latency_us_p50"),
-                "p95": agg.get("latency_us_p95"),
-                "p99": agg.get("latency_us_p99"),
-            }
-        )
+def _load_one(p: Path) -> Optional[Row]:
+    """Parse one result file into a Row, or None if it cannot be read."""
+
+    try:
+        data = load_sections(p)
+    except Exception:
+        return None
+    cfg = data.get("config", {})
+    agg = data.get("aggregate", {})
 
-    rows.sort(key=lambda r: (str(r.get("dataset")), int(r.get("num_vectors") or 0), str(r.get("mode")), str(r.get("hardware_level") or "")))
+    num_q = agg.get("num_queries") or cfg.get("num_queries") or 0
+    search_s = agg.get("search_time_s")
+    build_s = agg.get("build_time_s")
+
+    qps_search = agg.get("qps_search")
+    if qps_search is None and num_q and search_s is not None:
+        try:
+            s = float(search_s)
+            if s > 0.0:
+                qps_search = float(num_q) / s
+        except Exception:
+            qps_search = None
+    if qps_search is None:
+        qps_search = agg.get("qps")
+
+    qps_total = agg.get("qps_total")
+    if qps_total is None and num_q and build_s is not None and search_s is not None:
+        try:
+            b = float(build_s)
+            s = float(search_s)
+            if (b + s) > 0.0:
+                qps_total = float(num_q) / (b + s)
+        except Exception:
+            qps_total = None
+    if qps_total is None:
+        qps_total = agg.get("qps")
+
+    mode = cfg.get("mode")
+    if mode is None and cfg.get("hardware_level") is not None:
+        mode = "ann_ssd"
+
+    row = Row(
+        file=p.name,
+        dataset=cfg.get("dataset_name"),
+        num_vectors=cfg.get("num_vectors"),
+        mode=mode,
+        hardware_level=cfg.get("hardware_level"),
+        simulation_mode=cfg.get("simulation_mode"),
+        cache_capacity=cfg.get("cache_capacity"),
+        search_threads=cfg.get("search_threads"),
+        recall_at_k=agg.get("recall_at_k"),
+        effective_qps=agg.get("effective_qps"),
+        qps_search=qps_search,
+        qps_total=qps_total,
+        p50=agg.get("latency_us_p50"),
+        p95=agg.get("latency_us_p95"),
+        p99=agg.get("latency_us_p99"),
+    )
+    # The configuration label is used for grouping in every report and plot;
+    # derive it once per row here.
+    return row._replace(label=_label(row))
+
+
+def _load(paths: List[Path]) -> List[Row]:
+    # Files are independent; threads overlap the blocking reads (which
+    # release the GIL) while map() keeps input order.
+    if not paths:
+        return []
+    with ThreadPoolExecutor(max_workers=min(32, len(paths))) as ex:
+        rows = [r for r in ex.map(_load_one, paths) if r is not None]
+
+    rows.sort(key=lambda r: (str(r.dataset), int(r.num_vectors or 0), str(r.mode), str(r.hardware_level or "")))
     return rows
 
 
-def _label(r: Dict[str, Any]) -> str:
-    mode = r.get("mode")
+def _label(r: Row) -> str:
+    mode = r.mode
     if mode == "ann_ssd":
-        lvl = r.get("hardware_level")
-        sim = r.get("simulation_mode")
+        lvl = r.hardware_level
+        sim = r.simulation_mode
         s = f"annssd-{lvl}" if lvl else "annssd"
         if sim:
             s += f"-{sim}"
         return s
     if mode == "tiered":
-        cap = r.get("cache_capacity")
+        cap = r.cache_capacity
         return f"tiered(cap={cap})" if cap is not None else "tiered"
+    if mode == "hnswlib":
+        # Batched hnswlib search runs multi-threaded; keep that visible so
+        # its QPS is not read as a single-threaded number.
+        thr = r.search_threads
+        return f"hnswlib(threads={thr})" if thr and int(thr) > 1 else "hnswlib"
     return str(mode)
 
 
-def _print_table(rows: List[Dict[str, Any]]) -> None:
+def _print_table(rows: List[Row]) -> None:
     if not rows:
         print("No Experiment 12 results to show.")
         return
 
     headers = ["dataset", "num_vectors", "label", "recall", "qps_search", "eff_qps", "p50_us", "file"]
-    print("\n=== Experiment 12 Summary ===")
-    print("\t".join(headers))
+    # Build every line first and emit the table with a single write.
+    lines = ["", "=== Experiment 12 Summary ===", "\t".join(headers)]
     for r in rows:
-        print(
+        lines.append(
             "\t".join(
                 [
-                    str(r.get("dataset")),
-                    str(r.get("num_vectors")),
-                    _label(r),
-                    f"{r['recall_at_k']:.5f}" if r.get("recall_at_k") is not None else "",
-                    f"{r['qps_search']:.3f}" if r.get("qps_search") is not None else "",
-                    f"{r['effective_qps']:.3f}" if r.get("effective_qps") is not None else "",
-                    f"{r['p50']:.1f}" if r.get("p50") is not None else "",
-                    r.get("file") or "",
+                    str(r.dataset),
+                    str(r.num_vectors),
+                    r.label,
+                    f"{r.recall_at_k:.5f}" if r.recall_at_k is not None else "",
+                    f"{r.qps_search:.3f}" if r.qps_search is not None else "",
+                    f"{r.effective_qps:.3f}" if r.effective_qps is not None else "",
+                    f"{r.p50:.1f}" if r.p50 is not None else "",
+                    r.file or "",
                 ]
             )
         )
+    sys.stdout.write("\n".join(lines) + "\n")
+
+
+# (num_vectors, recall_at_k, effective_qps, row) with metrics already floats.
+PlotPoint = Tuple[int, float, float, Row]
+
+
+def _group_rows(
+    rows: List[Row],
+) -> Tuple[Dict[Tuple[str, int], List[Row]], Dict[Any, List[PlotPoint]]]:
+    """Build both report groupings in one pass over rows.
 
+    Returns (by_ds_nv, by_ds): rows keyed by (dataset, num_vectors) for the
+    recall-matched summary, and plottable points keyed by dataset for _plot.
+    """
 
-def _print_recall_matched(rows: List[Dict[str, Any]]) -> None:
+    by_ds_nv: Dict[Tuple[str, int], List[Row]] = {}
+    by_ds: Dict[Any, List[PlotPoint]] = {}
+    for r in rows:
+        ds = r.dataset
+        nv = r.num_vectors
+        if ds is not None and nv is not None:
+            try:
+                key = (str(ds), int(nv))
+            except Exception:
+                pass
+            else:
+                by_ds_nv.setdefault(key, []).append(r)
+
+        rec = r.recall_at_k
+        qps = r.effective_qps
+        if ds and rec is not None and qps is not None:
+            by_ds.setdefault(ds, []).append((int(nv or 0), float(rec), float(qps), r))
+    return by_ds_nv, by_ds
+
+
+def _print_recall_matched(
+    rows: List[Row], grouped: Optional[Dict[Tuple[str, int], List[Row]]] = None
+) -> None:
     if not rows:
         return
 
     targets = [0.85, 0.95, 0.99]
 
-    grouped: Dict[Tuple[str, int], List[Dict[str, Any]]] = {}
-    for r in rows:
-        ds = r.get("dataset")
-        nv = r.get("num_vectors")
-        if ds is None or nv is None:
-            continue
-        try:
-            key = (str(ds), int(nv))
-        except Exception:
-            continue
-        grouped.setdefault(key, []).append(r)
+    if grouped is None:
+        grouped = _group_rows(rows)[0]
 
     headers = ["dataset", "num_vectors", "target_recall", "label", "recall", "eff_qps", "file"]
     print("\n=== Experiment 12 Recall-Matched Summary (max effective_qps) ===")
     print("\t".join(headers))
 
     for (ds, nv), glist in sorted(grouped.items(), key=lambda x: (x[0][0], x[0][1])):
-        labels = sorted({_label(r) for r in glist})
+        labels = sorted({r.label for r in glist})
+
+        # Per label, (recall, qps, glist index, row) with metrics converted once.
+        by_label: Dict[str, List[Tuple[float, float, int, Row]]] = {}
+        for i, r in enumerate(glist):
+            rec = r.recall_at_k
+            q = r.effective_qps
+            if rec is None or q is None:
+                continue
+            try:
+                rec_f = float(rec)
+                q_f = float(q)
+            except Exception:
+                continue
+            by_label.setdefault(r.label, []).append((rec_f, q_f, i, r))
+
+        # Sorted by recall descending, the rows meeting a target form a
+        # prefix, so one walk per label answers every target (visited from
+        # the highest down) while carrying the running best. Equal QPS goes
+        # to the earliest row in glist order.
+        best_by: Dict[Tuple[str, float], Tuple[float, Row]] = {}
+        for lbl, arr in by_label.items():
+            arr.sort(key=lambda e: -e[0])
+            neg_recalls = [-e[0] for e in arr]
+            top: Optional[Tuple[float, float, int, Row]] = None
+            pos = 0
+            for t in sorted(targets, reverse=True):
+                end = bisect.bisect_right(neg_recalls, -t)
+                for e in arr[pos:end]:
+                    if top is None or e[1] > top[1] or (e[1] == top[1] and e[2] < top[2]):
+                        top = e
+                pos = max(pos, end)
+                if top is not None:
+                    best_by[(lbl, t)] = (top[1], top[3])
+
         for t in targets:
             for lbl in labels:
-                best = None
-                for r in glist:
-                    if _label(r) != lbl:
-                        continue
-                    rec = r.get("recall_at_k")
-                    q = r.get("effective_qps")
-                    if rec is None or q is None:
-                        continue
-                    try:
-                        if float(rec) < float(t):
-                            continue
-                    except Exception:
-                        continue
-                    if best is None or float(q) > float(best.get("effective_qps") or 0.0):
-                        best = r
+                hit = best_by.get((lbl, t))
+                best = hit[1] if hit is not None else None
 
                 if best is None:
                     print("\t".join([ds, str(nv), f"{t:.2f}", lbl, "", "", ""]))
@@ -172,14 +265,15 @@ def _print_recall_matched(rows: List[Dict[str, Any]]) -> None:
                                 str(nv),
                                 f"{t:.2f}",
                                 lbl,
-                                f"{float(best['recall_at_k']):.5f}",
-                                f"{float(best['effective_qps']):.3f}",
-                                str(best.get("file") or ""),
+                                f"{float(best.recall_at_k):.5f}",
+                                f"{float(best.effective_qps):.3f}",
+                                str(best.file or ""),
                             ]
                         )
                     )
 
 
+@lru_cache(maxsize=128)
 def _format_k(value: Any) -> str:
     """Format a numeric value using a compact k-suffix when appropriate."""
 
@@ -203,6 +297,7 @@ def _k_formatter(x: float, _pos) -> str:
     return _format_k(x)
 
 
+@lru_cache(maxsize=256)
 def _pretty_label(raw_label: str) -> str:
     """Map internal config labels to human-readable configuration names."""
 
@@ -211,6 +306,8 @@ def _pretty_label(raw_label: str) -> str:
         return "DRAM"
     if s == "hnswlib":
         return "HNSWlib"
+    if s.startswith("hnswlib(threads="):
+        return f"HNSWlib ({s[len('hnswlib(threads=') : -1]} thr)"
     if s.startswith("tiered"):
         # Show a concise label for the tiered design.
         return "Tiered"
@@ -226,11 +323,12 @@ def _pretty_label(raw_label: str) -> str:
     return s
 
 
+@lru_cache(maxsize=256)
 def _config_sort_key(raw_label: str) -> tuple:
     """Sort configurations in a sensible order for unified bar charts."""
 
     s = str(raw_label).lower()
-    if s == "hnswlib":
+    if s.startswith("hnswlib"):
         return (0, s)
     if s == "dram":
         return (1, s)
@@ -247,75 +345,67 @@ def _config_sort_key(raw_label: str) -> tuple:
     return (99, s)
 
 
-def _plot(rows: List[Dict[str, Any]], out_dir: Path) -> None:
+def _plot(
+    rows: List[Row], out_dir: Path, by_ds: Optional[Dict[Any, List[PlotPoint]]] = None
+) -> None:
     if not HAS_MPL:
         print("[INFO] matplotlib not available; skipping plots.")
         return
 
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    datasets = sorted({r.get("dataset") for r in rows if r.get("dataset")})
-    for ds in datasets:
-        sub = [r for r in rows if r.get("dataset") == ds]
-        pts = [
-            r
-            for r in sub
-            if r.get("effective_qps") is not None and r.get("recall_at_k") is not None
-        ]
-        if not pts:
-            continue
+    # Plottable rows bucketed by dataset, with num_vectors, recall and
+    # effective QPS converted once per row.
+    if by_ds is None:
+        by_ds = _group_rows(rows)[1]
+
+    # One Figure (recall axes + twin QPS axes) is reused for every dataset;
+    # only the axes contents are cleared between saves.
+    fig = None
+    for ds in sorted(by_ds):
+        pts = by_ds[ds]
 
         # Focus the unified comparison on the largest num_vectors for this
         # dataset so each bar represents the most demanding scale.
-        nv_values = [int(r.get("num_vectors") or 0) for r in pts if r.get("num_vectors")]
-        max_nv = max(nv_values) if nv_values else None
-        if max_nv is not None:
-            pts = [r for r in pts if int(r.get("num_vectors") or 0) == max_nv]
-        if not pts:
+        max_nv = max(nv for nv, _rec, _qps, _r in pts) or None
+
+        # For each configuration label (mode + hardware-level/cache params),
+        # keep a representative point in the same pass: the run with the
+        # highest recall, breaking ties by effective QPS.
+        best_by_label: Dict[str, Tuple[float, float]] = {}
+        for nv, rec, qps, r in pts:
+            if max_nv is not None and nv != max_nv:
+                continue
+            lbl = r.label
+            cur = best_by_label.get(lbl)
+            if cur is None or rec > cur[0] or (abs(rec - cur[0]) < 1e-6 and qps > cur[1]):
+                best_by_label[lbl] = (rec, qps)
+
+        if not best_by_label:
             continue
 
-        # Group by configuration label (mode + hardware-level/cache params).
-        groups: Dict[str, List[Dict[str, Any]]] = {}
-        for r in pts:
-            groups.setdefault(_label(r), []).append(r)
-
-        # For each configuration, choose a representative point: the run with
-        # the highest recall, breaking ties by effective QPS.
-        summaries: List[Tuple[str, Dict[str, Any]]] = []
-        for raw_lbl, glist in groups.items():
-            best = None
-            for r in glist:
-                rec = r.get("recall_at_k")
-                qps = r.get("effective_qps")
-                if rec is None or qps is None:
-                    continue
-                if best is None:
-                    best = r
-                    continue
-                brec = float(best.get("recall_at_k") or 0.0)
-                bqps = float(best.get("effective_qps") or 0.0)
-                if float(rec) > brec or (
-                    abs(float(rec) - brec) < 1e-6 and float(qps) > bqps
-                ):
-                    best = r
-            if best is not None:
-                summaries.append((raw_lbl, best))
-
-        if not summaries:
-            continue
-
-        summaries.sort(key=lambda pair: _config_sort_key(pair[0]))
+        summaries = sorted(best_by_label.items(), key=lambda pair: _config_sort_key(pair[0]))
 
-        raw_labels = [lbl for (lbl, _r) in summaries]
+        raw_labels = [lbl for (lbl, _vals) in summaries]
         display_labels = [_pretty_label(lbl) for lbl in raw_labels]
-        recall_vals = [float(r["recall_at_k"]) for (_lbl, r) in summaries]
-        eff_qps_vals = [float(r["effective_qps"]) for (_lbl, r) in summaries]
+        recall_vals = [rec for (_lbl, (rec, _qps)) in summaries]
+        eff_qps_vals = [qps for (_lbl, (_rec, qps)) in summaries]
 
         x = list(range(len(display_labels)))
         width = 0.4
 
-        fig, ax_recall = plt.subplots(figsize=(8, 4))
-        ax_qps = ax_recall.twinx()
+        if fig is None:
+            fig, ax_recall = plt.subplots(figsize=(8, 4))
+            ax_qps = ax_recall.twinx()
+        else:
+            ax_recall.clear()
+            ax_qps.clear()
+            # clear() resets the twin to a default left-hand axis; put its
+            # ticks/label back on the right as twinx() originally did.
+            ax_qps.yaxis.tick_right()
+            ax_qps.yaxis.set_label_position("right")
+            ax_qps.yaxis.set_offset_position("right")
+            ax_qps.patch.set_visible(False)
 
         # Recall bars (left y-axis)
         bar_recall = ax_recall.bar(
@@ -378,17 +468,14 @@ def _plot(rows: List[Dict[str, Any]], out_dir: Path) -> None:
                 fontsize=8,
             )
 
-        for bar, val in zip(bar_qps, eff_qps_vals):
+        # QPS bar labels are built once up front; non-k values are rounded
+        # to the nearest integer so we do not show long decimal strings.
+        qps_labels = [_format_k(v) for v in eff_qps_vals]
+        qps_labels = [
+            lbl if "k" in lbl else f"{int(round(v))}" for lbl, v in zip(qps_labels, eff_qps_vals)
+        ]
+        for bar, label_str in zip(bar_qps, qps_labels):
             height = bar.get_height()
-            label_str = _format_k(height)
-            # For non-k values, round to the nearest integer so we do not show
-            # long decimal strings on the bar labels.
-            if "k" not in label_str:
-                try:
-                    v = float(height)
-                    label_str = f"{int(round(v))}"
-                except Exception:
-                    pass
             ax_qps.annotate(
                 label_str,
                 xy=(bar.get_x() + bar.get_width() / 2.0, height),
@@ -415,6 +502,8 @@ def _plot(rows: List[Dict[str, Any]], out_dir: Path) -> None:
         fig.subplots_adjust(bottom=0.25)
         safe = str(ds).replace("/", "_")
         fig.savefig(out_dir / f"exp12_{safe}_recall_vs_effective_qps.png", dpi=150)
+
+    if fig is not None:
         plt.close(fig)
 
 
@@ -427,15 +516,19 @@ def main() -> int:
     exp_dir = script_path.parent.parent
 
     pattern = args.glob or "results/raw/exp12_*.json"
-    paths = sorted(exp_dir.glob(pattern))
+    if args.glob is None:
+        paths = fast_glob(exp_dir / "results" / "raw", "exp12_", ".json")
+    else:
+        paths = sorted(exp_dir.glob(pattern))
     if not paths:
         print(f"No JSON files found for pattern: {exp_dir / pattern}")
         return 0
 
     rows = _load(paths)
+    by_ds_nv, by_ds = _group_rows(rows)
     _print_table(rows)
-    _print_recall_matched(rows)
-    _plot(rows, exp_dir / "results" / "plots")
+    _print_recall_matched(rows, by_ds_nv)
+    _plot(rows, exp_dir / "results" / "plots", by_ds)
 
     return 0
 
@@ -1,83 +1,186 @@
 #!/usr/bin/env python3
 import argparse
+import hashlib
 import json
-import subprocess
+import os
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
 
+# Shared runner helpers live in the project-level scripts/ directory.
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "scripts"))
 
-def _run(cmd: List[str], cwd: Path) -> None:
-    print("\n[run_experiment12] exec:", " ".join(cmd))
-    proc = subprocess.run(cmd, cwd=str(cwd), text=True, capture_output=True)
-    if proc.returncode != 0:
-        if proc.stdout:
-            sys.stderr.write(proc.stdout)
-        if proc.stderr:
-            sys.stderr.write(proc.stderr)
-        raise SystemExit(proc.returncode)
-    if proc.stdout:
-        sys.stdout.write(proc.stdout)
+from run_common import run_all  # noqa: E402
 
+try:
+    import faiss  # type: ignore
 
-def _read_fvecs(path: Path) -> np.ndarray:
-    data = path.read_bytes()
-    if not data:
-        raise ValueError(f"Empty fvecs file: {path}")
-    dim = np.frombuffer(data, dtype=np.int32, count=1)[0]
+    HAS_FAISS = True
+except Exception:  # pragma: no cover
+    HAS_FAISS = False
+
+try:
+    import bottleneck as bn  # type: ignore
+
+    HAS_BOTTLENECK = True
+except Exception:  # pragma: no cover
+    HAS_BOTTLENECK = False
+
+# torch is only needed for GPU groundtruth, so it is imported lazily by
+# _ensure_cuda: runs whose groundtruth is cached skip its startup cost and
+# CUDA probe, and CPU-only runs never load its OpenMP runtime.
+torch: Any = None
+HAS_CUDA: Optional[bool] = None  # None until the first _ensure_cuda() call
+
+
+def _ensure_cuda() -> bool:
+    """Import torch on first use and report whether a CUDA device is usable."""
+
+    global torch, HAS_CUDA
+    if HAS_CUDA is not None:
+        return HAS_CUDA
+    try:
+        import torch as _torch  # type: ignore
+
+        HAS_CUDA = bool(_torch.cuda.is_available())
+    except Exception:  # pragma: no cover
+        HAS_CUDA = False
+        return False
+    torch = _torch
+    return HAS_CUDA
+
+
+def _map_vecs(path: Path, kind: str) -> np.ndarray:
+    """Memory-map a .fvecs/.ivecs file as an (n, 1 + dim) int32 record array.
+
+    The mapping is read-only and paged in lazily, so callers that only use
+    a leading slice never touch (or copy) the rest of the file.
+    """
+
+    size = path.stat().st_size
+    if size == 0:
+        raise ValueError(f"Empty {kind} file: {path}")
+    mm = np.memmap(path, dtype=np.int32, mode="r")
+    dim = int(mm[0])
     if dim <= 0:
-        raise ValueError(f"Invalid dim {dim} in fvecs file {path}")
-    record_size = 4 + int(dim) * 4
-    if len(data) % record_size != 0:
+        raise ValueError(f"Invalid dim {dim} in {kind} file {path}")
+    record_size = 4 + dim * 4
+    if size % record_size != 0:
         raise ValueError(
-            f"File size {len(data)} not divisible by record size {record_size} for dim {dim}"
+            f"File size {size} not divisible by record size {record_size} for dim {dim}"
         )
-    n = len(data) // record_size
-    arr = np.frombuffer(data, dtype=np.int32).reshape(n, 1 + int(dim))
-    vecs = arr[:, 1:].view(np.float32)
-    return vecs.copy()
+    n = size // record_size
+    return mm.reshape(n, 1 + dim)
+
+
+def _read_fvecs(path: Path) -> np.ndarray:
+    # Read-only float32 view into the mapping (no copy).
+    return _map_vecs(path, "fvecs")[:, 1:].view(np.float32)
 
 
 def _read_ivecs(path: Path) -> np.ndarray:
-    data = path.read_bytes()
-    if not data:
-        raise ValueError(f"Empty ivecs file: {path}")
-    dim = np.frombuffer(data, dtype=np.int32, count=1)[0]
-    if dim <= 0:
-        raise ValueError(f"Invalid dim {dim} in ivecs file {path}")
-    record_size = 4 + int(dim) * 4
-    if len(data) % record_size != 0:
-        raise ValueError(
-            f"File size {len(data)} not divisible by record size {record_size} for dim {dim}"
-        )
-    n = len(data) // record_size
-    arr = np.frombuffer(data, dtype=np.int32).reshape(n, 1 + int(dim))
-    ids = arr[:, 1:]
-    return ids.copy()
+    # Read-only int32 view into the mapping (no copy).
+    return _map_vecs(path, "ivecs")[:, 1:]
+
+
+# Query chunks scored concurrently by the NumPy groundtruth path. A live
+# chunk of c queries holds c x nb float32 scores plus c x nb int64
+# argpartition indices (12 * c * nb bytes), so the threaded path splits
+# chunk_q across the workers: peak stays at 12 * chunk_q * nb bytes, the same
+# as one serial chunk (~0.6 GB for chunk_q=512 at nb=100k).
+GT_MAX_WORKERS = 4
+
+
+def _gt_chunk(
+    base: np.ndarray, b_norms: np.ndarray, q: np.ndarray, k: int, out: np.ndarray
+) -> None:
+    """Exact top-k ids for one query chunk, written into `out`."""
+
+    # ||b||^2 - 2 q.b ranks neighbours the same as the full L2 distance;
+    # the per-query ||q||^2 term is constant along each row, so skip it.
+    dists = np.matmul(q, base.T)
+    dists *= -2.0
+    dists += b_norms
+    kth = min(k - 1, dists.shape[1] - 1)
+    if HAS_BOTTLENECK:
+        # Same contract as np.argpartition, with a faster C quickselect.
+        idx = bn.argpartition(dists, kth, axis=1)[:, :k]
+    else:
+        idx = np.argpartition(dists, kth=kth, axis=1)[:, :k]
+    out[:] = idx.astype(np.int32, copy=False)
+
+
+def _gt_knn_l2_cuda(base: np.ndarray, queries: np.ndarray, k: int, chunk_q: int) -> np.ndarray:
+    """GPU variant of the chunked groundtruth: cuBLAS matmul + torch.topk.
+
+    Base and its norms are uploaded once; queries go up chunk_q at a time
+    so only a chunk_q x nb score matrix is resident on the device.
+    """
+
+    dev = torch.device("cuda")
+    base_t = torch.from_numpy(base).to(dev)
+    b_norms = (base_t * base_t).sum(dim=1)
+
+    gt = np.empty((queries.shape[0], k), dtype=np.int32)
+    with torch.no_grad():
+        for start in range(0, queries.shape[0], chunk_q):
+            end = min(queries.shape[0], start + chunk_q)
+            q = torch.from_numpy(queries[start:end]).to(dev)
+            scores = torch.addmm(b_norms.expand(end - start, -1), q, base_t.T, alpha=-2.0)
+            _, idx = scores.topk(k, dim=1, largest=False)
+            gt[start:end] = idx.cpu().numpy().astype(np.int32, copy=False)
+    return gt
 
 
 def _compute_gt_knn_l2_chunked(
-    base: np.ndarray, queries: np.ndarray, k: int, chunk_q: int = 200
+    base: np.ndarray, queries: np.ndarray, k: int, chunk_q: int = 512
 ) -> np.ndarray:
     nq = queries.shape[0]
     if nq == 0:
         return np.empty((0, k), dtype=np.int32)
 
-    gt = np.empty((nq, k), dtype=np.int32)
-    b_norms = np.sum(base ** 2, axis=1, keepdims=True).T
-
-    for start in range(0, nq, chunk_q):
-        end = min(nq, start + chunk_q)
-        q = queries[start:end]
-        q_norms = np.sum(q ** 2, axis=1, keepdims=True)
-        dists = q_norms + b_norms - 2.0 * np.matmul(q, base.T)
-        kth = min(k - 1, dists.shape[1] - 1)
-        idx = np.argpartition(dists, kth=kth, axis=1)[:, :k]
-        gt[start:end] = idx.astype(np.int32, copy=False)
+    # Contiguous float32 throughout so the matmul goes straight to sgemm.
+    base = np.ascontiguousarray(base, dtype=np.float32)
+    queries = np.ascontiguousarray(queries, dtype=np.float32)
 
+    if _ensure_cuda():
+        return _gt_knn_l2_cuda(base, queries, k, chunk_q)
+
+    if HAS_FAISS:
+        # Exact brute-force search with faiss' fused L2 + top-k kernels,
+        # threaded over queries; never materializes the distance matrix.
+        index = faiss.IndexFlatL2(base.shape[1])
+        index.add(base)
+        _, ids = index.search(queries, k)
+        return ids.astype(np.int32)
+
+    gt = np.empty((nq, k), dtype=np.int32)
+    b_norms = np.einsum("ij,ij->i", base, base)
+
+    # Chunks are independent and write disjoint rows of gt. matmul and
+    # argpartition release the GIL, so worker threads overlap the
+    # single-threaded partition step while sharing base without copies.
+    workers = min(GT_MAX_WORKERS, os.cpu_count() or 1)
+    if workers > 1:
+        chunk_q = max(1, chunk_q // workers)
+    bounds = [(start, min(nq, start + chunk_q)) for start in range(0, nq, chunk_q)]
+    workers = min(workers, len(bounds))
+    if workers <= 1:
+        for start, end in bounds:
+            _gt_chunk(base, b_norms, queries[start:end], k, gt[start:end])
+        return gt
+
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        futures = [
+            ex.submit(_gt_chunk, base, b_norms, queries[start:end], k, gt[start:end])
+            for start, end in bounds
+        ]
+        for fut in futures:
+            fut.result()
     return gt
 
 
@@ -85,14 +188,16 @@ def _write_ivecs(path: Path, ids: np.ndarray) -> None:
     if ids.ndim != 2:
         raise ValueError("ids must be a 2D array")
     nq, k = ids.shape
-    if ids.dtype != np.int32:
-        ids = ids.astype(np.int32)
+
+    # Whole file as one (nq, 1 + k) int32 record array: a k header per row
+    # followed by that row's ids, written in a single call.
+    out = np.empty((nq, 1 + k), dtype=np.int32)
+    out[:, 0] = k
+    out[:, 1:] = ids
 
     path.parent.mkdir(parents=True, exist_ok=True)
     with path.open("wb") as f:
-        for i in range(nq):
-            f.write(np.int32(k).tobytes())
-            f.write(ids[i].tobytes())
+        f.write(out.tobytes())
 
 
 def _compute_recall_at_k(gt: np.ndarray, retrieved: np.ndarray, k: int) -> float:
@@ -100,32 +205,124 @@ def _compute_recall_at_k(gt: np.ndarray, retrieved: np.ndarray, k: int) -> float
     k_use = min(k, gt.shape[1], retrieved.shape[1])
     if k_use == 0:
         return 0.0
-    hits = 0
     total = nq * k
-    for i in range(nq):
-        gt_set = set(int(x) for x in gt[i, :k_use])
-        for j in range(k_use):
-            if int(retrieved[i, j]) in gt_set:
-                hits += 1
+    # (nq, k_use, k_use) comparison: each retrieved id counts once if it
+    # appears anywhere in its row's groundtruth. k is small, so this stays a
+    # few vectorized passes instead of a Python loop with a set per query.
+    hit = (retrieved[:, :k_use, None] == gt[:, None, :k_use]).any(axis=2)
+    hits = int(np.count_nonzero(hit))
     return hits / float(total)
 
 
-def _percentiles_us(vals_us: List[float]) -> Tuple[float, float, float]:
-    if not vals_us:
+def _percentiles_us(vals_us: np.ndarray) -> Tuple[float, float, float]:
+    if len(vals_us) == 0:
         return 0.0, 0.0, 0.0
-    xs = np.array(vals_us, dtype=np.float64)
-    return (
-        float(np.percentile(xs, 50)),
-        float(np.percentile(xs, 95)),
-        float(np.percentile(xs, 99)),
+    p = np.percentile(np.asarray(vals_us, dtype=np.float64), [50.0, 95.0, 99.0])
+    return float(p[0]), float(p[1]), float(p[2])
+
+
+# Single-query calls used only to sample the latency distribution; the
+# throughput numbers come from one batched knn_query over all queries.
+LATENCY_PROBE_QUERIES = 500
+
+
+def _search_hnswlib(index, queries: np.ndarray, k: int) -> Tuple[np.ndarray, float, np.ndarray, int]:
+    """Batched search for labels/search time, plus a per-query latency probe.
+
+    Returns (labels, search_s, lat_us, search_threads). The batched call runs
+    on every core, so its QPS is not single-threaded like the other modes;
+    callers record search_threads in the config. The probe replays the first LATENCY_PROBE_QUERIES queries
+    one at a time so the percentiles still reflect single-query latency.
+    """
+
+    search_threads = os.cpu_count() or 1
+    t1 = time.perf_counter()
+    labels, _ = index.knn_query(queries, k=k, num_threads=search_threads)
+    search_s = time.perf_counter() - t1
+
+    # Integer-ns clock into a preallocated array; the store happens after
+    # the second read so it stays outside the timed window.
+    n_probe = min(queries.shape[0], LATENCY_PROBE_QUERIES)
+    lat_ns = np.empty(n_probe, dtype=np.int64)
+    clock = time.perf_counter_ns
+    for i in range(n_probe):
+        q0 = clock()
+        index.knn_query(queries[i : i + 1], k=k, num_threads=1)
+        lat_ns[i] = clock() - q0
+    lat_us = lat_ns.astype(np.float64) * 1e-3
+
+    return labels.astype(np.int32, copy=False), search_s, lat_us, search_threads
+
+
+def _get_or_build_hnsw(
+    base: np.ndarray,
+    *,
+    dataset_name: str,
+    source: str,
+    dim: int,
+    M: int,
+    ef_construction: int,
+    cache_dir: Path,
+    num_threads: int,
+):
+    """Load a cached hnswlib graph for this base set, or build and cache it.
+
+    Returns (index, build_s). The file name carries the build parameters
+    (including num_threads) plus a hash of `source` (whatever identifies the
+    base vectors), so a changed dataset or config never picks up a stale
+    graph; delete results/raw/.cache to force rebuilds. The original build
+    time is kept in a sidecar JSON so cached runs still report the real
+    build cost at this thread count.
+    """
+
+    try:
+        import hnswlib  # type: ignore
+    except Exception as e:  # pragma: no cover
+        raise SystemExit(
+            "hnswlib is required for Experiment 12. Install under WSL with `pip install hnswlib`."
+        ) from e
+
+    nb = base.shape[0]
+    key = hashlib.sha1(
+        repr((source, nb, dim, M, ef_construction, num_threads)).encode("utf-8")
+    ).hexdigest()
+    name = (
+        f"hnsw_{dataset_name.lower()}_nb{nb}_M{M}_efc{ef_construction}"
+        f"_t{num_threads}_{key[:12]}"
     )
+    cache_path = cache_dir / f"{name}.bin"
+    meta_path = cache_dir / f"{name}.json"
+
+    if cache_path.exists() and meta_path.exists():
+        try:
+            index = hnswlib.Index(space="l2", dim=dim)
+            index.load_index(str(cache_path), max_elements=nb)
+            build_s = float(json.loads(meta_path.read_text(encoding="utf-8"))["build_time_s"])
+        except Exception:
+            pass
+        else:
+            if index.get_current_count() == nb:
+                print(f"[run_experiment12] hnswlib index cache hit: {cache_path.name}")
+                return index, build_s
+
+    index = hnswlib.Index(space="l2", dim=dim)
+
+    t0 = time.perf_counter()
+    index.init_index(max_elements=nb, ef_construction=ef_construction, M=M)
+    index.add_items(base, ids=np.arange(nb, dtype=np.int32), num_threads=num_threads)
+    build_s = time.perf_counter() - t0
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    index.save_index(str(cache_path))
+    meta_path.write_text(json.dumps({"build_time_s": build_s}), encoding="utf-8")
+    return index, build_s
 
 
 def _run_hnswlib(
     *,
-    base_path: Path,
-    query_path: Path,
-    groundtruth_path: Optional[Path],
+    base_all: np.ndarray,
+    query_all: np.ndarray,
+    gt: Optional[np.ndarray],
     dataset_name: str,
     num_base: int,
     num_queries: int,
@@ -135,16 +332,10 @@ def _run_hnswlib(
     ef_construction: int,
     ef_search: int,
     json_out: Path,
+    source: str,
+    cache_dir: Path,
+    build_threads: int,
 ) -> None:
-    try:
-        import hnswlib  # type: ignore
-    except Exception as e:
-        raise SystemExit(
-            "hnswlib is required for Experiment 12. Install under WSL with `pip install hnswlib`."
-        ) from e
-
-    base_all = _read_fvecs(base_path)
-    query_all = _read_fvecs(query_path)
     if base_all.shape[1] != dim:
         raise SystemExit(f"Base dim mismatch: expected {dim}, got {base_all.shape[1]}")
     if query_all.shape[1] != dim:
@@ -156,34 +347,27 @@ def _run_hnswlib(
     base = base_all[:nb]
     queries = query_all[:nq]
 
-    if groundtruth_path is not None:
-        gt_full = _read_ivecs(groundtruth_path)
-        if gt_full.shape[0] < nq:
-            raise SystemExit(f"Groundtruth queries {gt_full.shape[0]} < num_queries {nq}")
-        gt_eval = gt_full[:nq, :k]
+    if gt is not None:
+        if gt.shape[0] < nq:
+            raise SystemExit(f"Groundtruth queries {gt.shape[0]} < num_queries {nq}")
+        gt_eval = gt[:nq, :k]
     else:
         gt_eval = _compute_gt_knn_l2_chunked(base, queries, k)
 
-    index = hnswlib.Index(space="l2", dim=dim)
-
-    t0 = time.perf_counter()
-    index.init_index(max_elements=nb, ef_construction=ef_construction, M=M)
-    index.add_items(base, ids=np.arange(nb, dtype=np.int32))
-    build_s = time.perf_counter() - t0
+    index, build_s = _get_or_build_hnsw(
+        base,
+        dataset_name=dataset_name,
+        source=source,
+        dim=dim,
+        M=M,
+        ef_construction=ef_construction,
+        cache_dir=cache_dir,
+        num_threads=build_threads,
+    )
 
     index.set_ef(ef_search)
 
-    lat_us: List[float] = []
-    all_labels = np.empty((nq, k), dtype=np.int32)
-
-    t1 = time.perf_counter()
-    for i in range(nq):
-        q0 = time.perf_counter()
-        labels, _ = index.knn_query(queries[i : i + 1], k=k)
-        q1 = time.perf_counter()
-        lat_us.append((q1 - q0) * 1e6)
-        all_labels[i] = labels[0]
-    search_s = time.perf_counter() - t1
+    all_labels, search_s, lat_us, search_threads = _search_hnswlib(index, queries, k)
 
     recall = _compute_recall_at_k(gt_eval, all_labels, k)
 
@@ -204,6 +388,8 @@ def _run_hnswlib(
             "M": M,
             "ef_construction": ef_construction,
             "mode": "hnswlib",
+            "build_threads": build_threads,
+            "search_threads": search_threads,
         },
         "aggregate": {
             "k": k,
@@ -240,6 +426,8 @@ def _run_hnswlib_synth(
     ef_search: int,
     json_out: Path,
     seed: int,
+    cache_dir: Path,
+    build_threads: int,
 ) -> None:
     """Run an HNSWLib baseline on a synthetic Gaussian dataset.
 
@@ -248,39 +436,26 @@ def _run_hnswlib_synth(
     tiered, and ANN-in-SSD.
     """
 
-    try:
-        import hnswlib  # type: ignore
-    except Exception as e:  # pragma: no cover
-        raise SystemExit(
-            "hnswlib is required for Experiment 12. Install under WSL with `pip install hnswlib`."
-        ) from e
-
     rng = np.random.default_rng(seed)
-    base = rng.standard_normal(size=(num_base, dim)).astype(np.float32, copy=False)
-    queries = rng.standard_normal(size=(num_queries, dim)).astype(np.float32, copy=False)
+    base = rng.standard_normal(size=(num_base, dim), dtype=np.float32)
+    queries = rng.standard_normal(size=(num_queries, dim), dtype=np.float32)
 
     gt_eval = _compute_gt_knn_l2_chunked(base, queries, k)
 
-    index = hnswlib.Index(space="l2", dim=dim)
-
-    t0 = time.perf_counter()
-    index.init_index(max_elements=num_base, ef_construction=ef_construction, M=M)
-    index.add_items(base, ids=np.arange(num_base, dtype=np.int32))
-    build_s = time.perf_counter() - t0
+    index, build_s = _get_or_build_hnsw(
+        base,
+        dataset_name=dataset_name,
+        source=f"gaussian_f32_seed{seed}",
+        dim=dim,
+        M=M,
+        ef_construction=ef_construction,
+        cache_dir=cache_dir,
+        num_threads=build_threads,
+    )
 
     index.set_ef(ef_search)
 
-    lat_us: List[float] = []
-    all_labels = np.empty((num_queries, k), dtype=np.int32)
-
-    t1 = time.perf_counter()
-    for i in range(num_queries):
-        q0 = time.perf_counter()
-        labels, _ = index.knn_query(queries[i : i + 1], k=k)
-        q1 = time.perf_counter()
-        lat_us.append((q1 - q0) * 1e6)
-        all_labels[i] = labels[0]
-    search_s = time.perf_counter() - t1
+    all_labels, search_s, lat_us, search_threads = _search_hnswlib(index, queries, k)
 
     recall = _compute_recall_at_k(gt_eval, all_labels, k)
     p50, p95, p99 = _percentiles_us(lat_us)
@@ -300,6 +475,8 @@ def _run_hnswlib_synth(
             "M": M,
             "ef_construction": ef_construction,
             "mode": "hnswlib",
+            "build_threads": build_threads,
+            "search_threads": search_threads,
         },
         "aggregate": {
             "k": k,
@@ -331,6 +508,15 @@ def main() -> int:
         action="store_true",
         help="Run a smaller subset (SIFT20k + synthetic20k only).",
     )
+    p.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help=(
+            "Benchmark processes to run concurrently (default: 1). Concurrent runs "
+            "share cores, so their QPS and latency are measured under contention."
+        ),
+    )
     args = p.parse_args()
 
     script_path = Path(__file__).resolve()
@@ -354,6 +540,10 @@ def main() -> int:
     ef_search = 512
     hnsw_build_threads = 8
 
+    # Timed runs go one at a time unless --jobs opts into concurrency; the
+    # DRAM/tiered and ANN-SSD batches still run as separate pools.
+    jobs = max(1, args.jobs)
+
     # Tiered SSD model
     ssd_base_latency_us = 80.0
     ssd_bw_GBps = 3.0
@@ -387,26 +577,47 @@ def main() -> int:
     if not args.quick:
         synth_points.append((100000, 2000))
 
+    # benchmark_recall invocations are collected here and launched together
+    # once the in-process hnswlib baselines and groundtruth files are done.
+    cmds: List[List[str]] = []
+    ann_cmds: List[List[str]] = []
+
+    # Path arguments shared by every command line, converted once.
+    bin_str = str(bin_path)
+    sift_base_str = str(sift_base)
+    sift_query_str = str(sift_query)
+
+    # SIFT base/queries are mapped once and sliced per (nb, nq) point, both
+    # for the groundtruth subsets and the in-process hnswlib baseline.
+    sift_base_all = _read_fvecs(sift_base)
+    sift_query_all = _read_fvecs(sift_query)
+    st = sift_base.stat()
+    sift_source = f"{sift_base.resolve()}:{st.st_size}:{st.st_mtime_ns}"
+
+    # hnswlib graphs are cached here across invocations (see _get_or_build_hnsw).
+    index_cache = results_raw / ".cache"
+
     # 1) SIFT runs: hnswlib + our DRAM/tiered + ANN-SSD
     for nb, nq in sift_points:
         ds = "SIFT1M"
         tag = f"exp12_sift_nb{nb}_q{nq}_M{M}_efs{ef_search}"
 
+        # The subset groundtruth stays on disk for benchmark_recall; the
+        # array itself is handed straight to the hnswlib run.
         gt_subset = results_raw / f"{tag}_gt_k{k}.ivecs"
-        if not gt_subset.exists():
-            base_all = _read_fvecs(sift_base)
-            query_all = _read_fvecs(sift_query)
-            base = base_all[:nb]
-            queries = query_all[:nq]
-            gt = _compute_gt_knn_l2_chunked(base, queries, k)
+        if gt_subset.exists():
+            gt = _read_ivecs(gt_subset)
+        else:
+            gt = _compute_gt_knn_l2_chunked(sift_base_all[:nb], sift_query_all[:nq], k)
             _write_ivecs(gt_subset, gt)
+        gt_subset_str = str(gt_subset)
 
         # hnswlib
         out_h = results_raw / f"{tag}_mode-hnswlib.json"
         _run_hnswlib(
-            base_path=sift_base,
-            query_path=sift_query,
-            groundtruth_path=gt_subset,
+            base_all=sift_base_all,
+            query_all=sift_query_all,
+            gt=gt,
             dataset_name=ds,
             num_base=nb,
             num_queries=nq,
@@ -416,12 +627,15 @@ def main() -> int:
             ef_construction=ef_construction,
             ef_search=ef_search,
             json_out=out_h,
+            source=sift_source,
+            cache_dir=index_cache,
+            build_threads=hnsw_build_threads,
         )
 
         # ours DRAM
         out_d = results_raw / f"{tag}_mode-dram.json"
         cmd = [
-            str(bin_path),
+            bin_str,
             "--mode",
             "dram",
             "--num-base",
@@ -445,21 +659,21 @@ def main() -> int:
             "--dataset-name",
             ds,
             "--dataset-path",
-            str(sift_base),
+            sift_base_str,
             "--query-path",
-            str(sift_query),
+            sift_query_str,
             "--groundtruth-path",
-            str(gt_subset),
+            gt_subset_str,
             "--json-out",
             str(out_d),
         ]
-        _run(cmd, project_dir)
+        cmds.append(cmd)
 
         # ours tiered
         cap = max(1, int(nb * cache_frac))
         out_t = results_raw / f"{tag}_mode-tiered_cache{int(cache_frac*100)}.json"
         cmd = [
-            str(bin_path),
+            bin_str,
             "--mode",
             "tiered",
             "--num-base",
@@ -495,22 +709,22 @@ def main() -> int:
             "--dataset-name",
             ds,
             "--dataset-path",
-            str(sift_base),
+            sift_base_str,
             "--query-path",
-            str(sift_query),
+            sift_query_str,
             "--groundtruth-path",
-            str(gt_subset),
+            gt_subset_str,
             "--json-out",
             str(out_t),
         ]
-        _run(cmd, project_dir)
+        cmds.append(cmd)
 
         # ANN-SSD: run both full-scan (max_steps=0) and a mid-steps config
         for lvl in ann_levels:
             # Full-scan / high-recall configuration (max_steps=0)
             out_a = results_raw / f"{tag}_mode-annssd_level-{lvl}.json"
             cmd = [
-                str(bin_path),
+                bin_str,
                 "--mode",
                 "ann_ssd",
                 "--num-base",
@@ -526,11 +740,11 @@ def main() -> int:
                 "--dataset-name",
                 ds,
                 "--dataset-path",
-                str(sift_base),
+                sift_base_str,
                 "--query-path",
-                str(sift_query),
+                sift_query_str,
                 "--groundtruth-path",
-                str(gt_subset),
+                gt_subset_str,
                 "--ann-ssd-mode",
                 "cheated",
                 "--ann-hw-level",
@@ -544,14 +758,14 @@ def main() -> int:
                 "--json-out",
                 str(out_a),
             ]
-            _run(cmd, project_dir)
+            ann_cmds.append(cmd)
 
             # Mid-steps configuration: ~0.5 * number_of_blocks to target ~0.85-0.9 recall
             num_blocks = (nb + ann_vectors_per_block - 1) // ann_vectors_per_block
             max_steps_mid = max(1, int(num_blocks * 0.5))
             out_a_mid = results_raw / f"{tag}_mode-annssd_level-{lvl}_steps{max_steps_mid}.json"
             cmd_mid = [
-                str(bin_path),
+                bin_str,
                 "--mode",
                 "ann_ssd",
                 "--num-base",
@@ -567,11 +781,11 @@ def main() -> int:
                 "--dataset-name",
                 ds,
                 "--dataset-path",
-                str(sift_base),
+                sift_base_str,
                 "--query-path",
-                str(sift_query),
+                sift_query_str,
                 "--groundtruth-path",
-                str(gt_subset),
+                gt_subset_str,
                 "--ann-ssd-mode",
                 "cheated",
                 "--ann-hw-level",
@@ -585,13 +799,13 @@ def main() -> int:
                 "--json-out",
                 str(out_a_mid),
             ]
-            _run(cmd_mid, project_dir)
+            ann_cmds.append(cmd_mid)
 
             # High-steps configuration: ~0.95 * number_of_blocks to target ~0.95-0.99 recall
             max_steps_hi = max(1, int(num_blocks * 0.95))
             out_a_hi = results_raw / f"{tag}_mode-annssd_level-{lvl}_steps{max_steps_hi}.json"
             cmd_hi = [
-                str(bin_path),
+                bin_str,
                 "--mode",
                 "ann_ssd",
                 "--num-base",
@@ -607,11 +821,11 @@ def main() -> int:
                 "--dataset-name",
                 ds,
                 "--dataset-path",
-                str(sift_base),
+                sift_base_str,
                 "--query-path",
-                str(sift_query),
+                sift_query_str,
                 "--groundtruth-path",
-                str(gt_subset),
+                gt_subset_str,
                 "--ann-ssd-mode",
                 "cheated",
                 "--ann-hw-level",
@@ -625,7 +839,7 @@ def main() -> int:
                 "--json-out",
                 str(out_a_hi),
             ]
-            _run(cmd_hi, project_dir)
+            ann_cmds.append(cmd_hi)
 
     # 2) Synthetic runs: our DRAM/tiered + ANN-SSD (no hnswlib)
     for nb, nq in synth_points:
@@ -645,11 +859,13 @@ def main() -> int:
             ef_search=ef_search,
             json_out=out_h,
             seed=seed,
+            cache_dir=index_cache,
+            build_threads=hnsw_build_threads,
         )
 
         out_d = results_raw / f"{tag}_mode-dram.json"
         cmd = [
-            str(bin_path),
+            bin_str,
             "--mode",
             "dram",
             "--num-base",
@@ -675,12 +891,12 @@ def main() -> int:
             "--json-out",
             str(out_d),
         ]
-        _run(cmd, project_dir)
+        cmds.append(cmd)
 
         cap = max(1, int(nb * cache_frac))
         out_t = results_raw / f"{tag}_mode-tiered_cache{int(cache_frac*100)}.json"
         cmd = [
-            str(bin_path),
+            bin_str,
             "--mode",
             "tiered",
             "--num-base",
@@ -718,13 +934,13 @@ def main() -> int:
             "--json-out",
             str(out_t),
         ]
-        _run(cmd, project_dir)
+        cmds.append(cmd)
 
         for lvl in ann_levels:
             # Full-scan / high-recall configuration (max_steps=0)
             out_a = results_raw / f"{tag}_mode-annssd_level-{lvl}.json"
             cmd = [
-                str(bin_path),
+                bin_str,
                 "--mode",
                 "ann_ssd",
                 "--num-base",
@@ -752,14 +968,14 @@ def main() -> int:
                 "--json-out",
                 str(out_a),
             ]
-            _run(cmd, project_dir)
+            ann_cmds.append(cmd)
 
             # Mid-steps configuration: ~0.5 * number_of_blocks to target ~0.85-0.9 recall
             num_blocks = (nb + ann_vectors_per_block - 1) // ann_vectors_per_block
             max_steps_mid = max(1, int(num_blocks * 0.5))
             out_a_mid = results_raw / f"{tag}_mode-annssd_level-{lvl}_steps{max_steps_mid}.json"
             cmd_mid = [
-                str(bin_path),
+                bin_str,
                 "--mode",
                 "ann_ssd",
                 "--num-base",
@@ -787,7 +1003,10 @@ def main() -> int:
                 "--json-out",
                 str(out_a_mid),
             ]
-            _run(cmd_mid, project_dir)
+            ann_cmds.append(cmd_mid)
+
+    run_all(cmds, project_dir, "run_experiment12", jobs)
+    run_all(ann_cmds, project_dir, "run_experiment12", jobs)
 
     print("\n[run_experiment12] wrote JSON logs to", results_raw)
     return 0
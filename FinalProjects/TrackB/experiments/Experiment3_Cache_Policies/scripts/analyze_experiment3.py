@@ -12,76 +12,124 @@ Usage (from project root via WSL):
 
 import argparse
 import json
+import sys
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, List, NamedTuple, Optional
+
+# Shared analyzer helpers live in the project-level scripts/ directory.
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "scripts"))
+
+from analyze_common import fast_glob, load_cached_rows  # noqa: E402
 
 try:
+    import matplotlib
+
+    matplotlib.use("Agg")
     import matplotlib.pyplot as plt  # type: ignore
     from matplotlib.ticker import FuncFormatter
+
     HAS_MPL = True
 except Exception:  # pragma: no cover
     HAS_MPL = False
 
+try:
+    import orjson  # type: ignore
+
+    _json_loads = orjson.loads
+except ImportError:  # pragma: no cover
+    _json_loads = json.loads
+
+
+class Row(NamedTuple):
+    """One Experiment 3 result file, flattened (fixed fields, no per-row dict)."""
+
+    file: str
+    policy: str
+    cache_capacity: Optional[int]
+    recall: Optional[float]
+    qps_search: Optional[float]
+    qps_total: Optional[float]
+    effective_qps: Optional[float]
+    build_time_s: Optional[float]
+    search_time_s: Optional[float]
+    device_time_us: Optional[float]
+    num_reads: Optional[int]
+    bytes_read: Optional[int]
+    cache_hits: Optional[int]
+    cache_misses: Optional[int]
+    hit_rate: Optional[float]
+
+
+def _load_one(p: Path) -> Optional[Row]:
+    try:
+        # Raw bytes: orjson decodes UTF-8 itself and stdlib json accepts bytes.
+        data = _json_loads(p.read_bytes())
+    except Exception as e:  # pragma: no cover
+        print(f"[WARN] Failed to load {p}: {e}")
+        return None
 
-def load_results(paths: List[Path]) -> List[Dict[str, Any]]:
-    rows: List[Dict[str, Any]] = []
-    for p in paths:
+    cfg = data.get("config", {})
+    agg = data.get("aggregate", {})
+    io = agg.get("io", {})
+
+    num_q = agg.get("num_queries") or cfg.get("num_queries") or 0
+    search_s = agg.get("search_time_s")
+
+    qps_search = agg.get("qps_search")
+    if qps_search is None and num_q and search_s is not None:
         try:
-            with p.open("r", encoding="utf-8") as f:
-                data = json.load(f)
-        except Exception as e:  # pragma: no cover
-            print(f"[WARN] Failed to load {p}: {e}")
-            continue
+            s = float(search_s)
+            if s > 0.0:
+                qps_search = float(num_q) / s
+        except Exception:
+            qps_search = None
+
+    qps_total = agg.get("qps_total")
+    if qps_total is None:
+        qps_total = agg.get("qps")
+
+    hits = agg.get("cache_hits")
+    misses = agg.get("cache_misses")
+    hit_rate = None
+    if hits is not None and misses is not None and (hits + misses) > 0:
+        hit_rate = float(hits) / float(hits + misses)
+
+    return Row(
+        file=p.name,
+        policy=cfg.get("cache_policy", ""),
+        cache_capacity=cfg.get("cache_capacity"),
+        recall=agg.get("recall_at_k"),
+        qps_search=qps_search,
+        qps_total=qps_total,
+        effective_qps=agg.get("effective_qps"),
+        build_time_s=agg.get("build_time_s"),
+        search_time_s=agg.get("search_time_s"),
+        device_time_us=agg.get("device_time_us"),
+        num_reads=io.get("num_reads"),
+        bytes_read=io.get("bytes_read"),
+        cache_hits=hits,
+        cache_misses=misses,
+        hit_rate=hit_rate,
+    )
 
-        cfg = data.get("config", {})
-        agg = data.get("aggregate", {})
-        io = agg.get("io", {})
-
-        num_q = agg.get("num_queries") or cfg.get("num_queries") or 0
-        search_s = agg.get("search_time_s")
-
-        qps_search = agg.get("qps_search")
-        if qps_search is None and num_q and search_s is not None:
-            try:
-                s = float(search_s)
-                if s > 0.0:
-                    qps_search = float(num_q) / s
-            except Exception:
-                qps_search = None
-
-        qps_total = agg.get("qps_total")
-        if qps_total is None:
-            qps_total = agg.get("qps")
-
-        hits = agg.get("cache_hits")
-        misses = agg.get("cache_misses")
-        hit_rate = None
-        if hits is not None and misses is not None and (hits + misses) > 0:
-            hit_rate = float(hits) / float(hits + misses)
-
-        rows.append(
-            {
-                "file": p.name,
-                "policy": cfg.get("cache_policy", ""),
-                "cache_capacity": cfg.get("cache_capacity"),
-                "recall": agg.get("recall_at_k"),
-                "qps_search": qps_search,
-                "qps_total": qps_total,
-                "effective_qps": agg.get("effective_qps"),
-                "build_time_s": agg.get("build_time_s"),
-                "search_time_s": agg.get("search_time_s"),
-                "device_time_us": agg.get("device_time_us"),
-                "num_reads": io.get("num_reads"),
-                "bytes_read": io.get("bytes_read"),
-                "cache_hits": hits,
-                "cache_misses": misses,
-                "hit_rate": hit_rate,
-            }
-        )
-    return rows
+
+# Bump when _load_one's output changes so rows cached by older logic are
+# re-parsed instead of served.
+ROW_CACHE_SCHEMA = 1
+
+
+def load_results(paths: List[Path], cache_path: Optional[Path] = None) -> List[Row]:
+    """Flatten result JSON files into rows, in input order.
+
+    When cache_path is given, rows are memoized there keyed by
+    (path, mtime_ns, size) under ROW_CACHE_SCHEMA, so unchanged files cost
+    only a stat() on re-runs.
+    """
+
+    return load_cached_rows(paths, _load_one, cache_path, ROW_CACHE_SCHEMA)
 
 
-def print_table(rows: List[Dict[str, Any]]) -> None:
+def print_table(rows: List[Row]) -> None:
     if not rows:
         print("No Experiment 3 results to show.")
         return
@@ -100,26 +148,27 @@ def print_table(rows: List[Dict[str, Any]]) -> None:
         "dev_us",
     ]
 
-    print("\n=== Experiment 3 Summary (Cache Policies) ===")
-    print("\t".join(headers))
+    # Build every line first and emit the table with a single write.
+    lines = ["", "=== Experiment 3 Summary (Cache Policies) ===", "\t".join(headers)]
     for r in rows:
-        print(
+        lines.append(
             "\t".join(
                 [
-                    r["file"],
-                    str(r["policy"]),
-                    str(r["cache_capacity"]),
-                    f"{r['recall']:.5f}" if r["recall"] is not None else "",
-                    f"{r['qps_search']:.3f}" if r["qps_search"] is not None else "",
-                    f"{r['qps_total']:.3f}" if r["qps_total"] is not None else "",
-                    f"{r['effective_qps']:.3f}" if r["effective_qps"] is not None else "",
-                    f"{r['hit_rate']:.3f}" if r["hit_rate"] is not None else "",
-                    str(r["num_reads"]),
-                    str(r["bytes_read"]),
-                    f"{r['device_time_us']:.1f}" if r["device_time_us"] is not None else "",
+                    r.file,
+                    str(r.policy),
+                    str(r.cache_capacity),
+                    f"{r.recall:.5f}" if r.recall is not None else "",
+                    f"{r.qps_search:.3f}" if r.qps_search is not None else "",
+                    f"{r.qps_total:.3f}" if r.qps_total is not None else "",
+                    f"{r.effective_qps:.3f}" if r.effective_qps is not None else "",
+                    f"{r.hit_rate:.3f}" if r.hit_rate is not None else "",
+                    str(r.num_reads),
+                    str(r.bytes_read),
+                    f"{r.device_time_us:.1f}" if r.device_time_us is not None else "",
                 ]
             )
         )
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def _format_k(value: Any) -> str:
@@ -145,7 +194,7 @@ def _k_formatter(x: float, _pos) -> str:
     return _format_k(x)
 
 
-def make_plots(rows: List[Dict[str, Any]], out_dir: Path) -> None:
+def make_plots(rows: List[Row], out_dir: Path) -> None:
     if not HAS_MPL:
         print("[INFO] matplotlib not available; skipping Experiment 3 plots.")
         return
@@ -155,16 +204,20 @@ def make_plots(rows: List[Dict[str, Any]], out_dir: Path) -> None:
     out_dir.mkdir(parents=True, exist_ok=True)
 
     # Sort by policy name for a stable order.
-    rows_sorted = sorted(rows, key=lambda r: str(r["policy"]))
+    rows_sorted = sorted(rows, key=lambda r: str(r.policy))
 
-    labels = [str(r["policy"]).upper() for r in rows_sorted]
+    labels = [str(r.policy).upper() for r in rows_sorted]
     x = list(range(len(labels)))
 
-    hit_rates = [r["hit_rate"] for r in rows_sorted]
-    eff_qps = [r["effective_qps"] for r in rows_sorted]
+    hit_rates = [r.hit_rate for r in rows_sorted]
+    eff_qps = [r.effective_qps for r in rows_sorted]
 
-    # Plot 1: cache hit rate vs policy
+    # One Figure/Axes pair is reused for both plots; only the axes contents
+    # are cleared between saves.
     fig, ax = plt.subplots(figsize=(6, 4))
+    k_fmt = FuncFormatter(_k_formatter)
+
+    # Plot 1: cache hit rate vs policy
     bars = ax.bar(x, hit_rates, color="C0")
     ax.set_xticks(x)
     ax.set_xticklabels(labels, rotation=0, ha="center")
@@ -191,10 +244,9 @@ def make_plots(rows: List[Dict[str, Any]], out_dir: Path) -> None:
     fig.tight_layout()
     fig.subplots_adjust(bottom=0.3)
     fig.savefig(out_dir / "exp3_hit_rate_vs_policy.png", dpi=150)
-    plt.close(fig)
 
     # Plot 2: effective QPS vs policy
-    fig, ax = plt.subplots(figsize=(6, 4))
+    ax.clear()
     bars_qps = ax.bar(x, eff_qps, color="C1")
     ax.set_xticks(x)
     ax.set_xticklabels(labels, rotation=0, ha="center")
@@ -204,7 +256,7 @@ def make_plots(rows: List[Dict[str, Any]], out_dir: Path) -> None:
 
     # Use k-style formatting so large QPS values remain readable, and add a
     # bit of headroom to avoid clipping the tallest bar.
-    ax.yaxis.set_major_formatter(FuncFormatter(_k_formatter))
+    ax.yaxis.set_major_formatter(k_fmt)
     if eff_qps:
         try:
             ymax = max(float(v) for v in eff_qps if v is not None)
@@ -250,12 +302,15 @@ def main() -> int:
     exp_dir = script_path.parent.parent
 
     pattern = args.glob or "results/raw/exp3_*.json"
-    paths = sorted(exp_dir.glob(pattern))
+    if args.glob is None:
+        paths = fast_glob(exp_dir / "results" / "raw", "exp3_", ".json")
+    else:
+        paths = sorted(exp_dir.glob(pattern))
     if not paths:
         print(f"No JSON files found for pattern: {exp_dir / pattern}")
         return 0
 
-    rows = load_results(paths)
+    rows = load_results(paths, exp_dir / "results" / "raw" / ".cache" / "analyze_rows.pkl")
     print_table(rows)
 
     plots_dir = exp_dir / "results" / "plots"
@@ -1,36 +1,64 @@
 #!/usr/bin/env python3
+import argparse
 import json
+import os
 import re
+import shutil
 import subprocess
 import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
 
+# Shared runner helpers live in the project-level scripts/ directory.
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "scripts"))
 
-def _run(cmd, cwd: Path) -> str:
+from run_common import summary_qps  # noqa: E402
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover
+    orjson = None
+
+_TIERED_RE = re.compile(r"Tiered cache: hits=(\d+), misses=(\d+)")
+
+
+def _run(cmd: List[str], cwd: Path) -> Optional[Tuple[int, int]]:
+    """Run cmd, forwarding its output, and return the Tiered cache (hits, misses)."""
     print("\n[run_experiment3] exec:", " ".join(cmd))
-    proc = subprocess.run(cmd, cwd=str(cwd), text=True, capture_output=True)
-    if proc.returncode != 0:
-        if proc.stdout:
-            sys.stderr.write(proc.stdout)
-        if proc.stderr:
-            sys.stderr.write(proc.stderr)
-        raise SystemExit(proc.returncode)
-    if proc.stdout:
-        sys.stdout.write(proc.stdout)
-    return proc.stdout or ""
-
-
-def _inject_cache_stats(json_path: Path, stdout: str) -> None:
-    """Parse Tiered cache stats from stdout and inject into JSON aggregate."""
-    m = re.search(r"Tiered cache: hits=(\d+), misses=(\d+)", stdout)
-    if not m:
+    stats = None
+    # Stream line by line rather than capturing everything, and stop matching
+    # once the stats line has been seen.
+    with subprocess.Popen(
+        cmd,
+        cwd=str(cwd),
+        text=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        bufsize=1,
+    ) as proc:
+        for line in proc.stdout:
+            sys.stdout.write(line)
+            if stats is None:
+                m = _TIERED_RE.search(line)
+                if m:
+                    stats = (int(m.group(1)), int(m.group(2)))
+        rc = proc.wait()
+    if rc != 0:
+        raise SystemExit(rc)
+    return stats
+
+
+def _inject_cache_stats(json_path: Path, stats: Optional[Tuple[int, int]]) -> None:
+    """Inject Tiered cache (hits, misses) into the JSON aggregate."""
+    if stats is None:
         return
-    hits = int(m.group(1))
-    misses = int(m.group(2))
+    hits, misses = stats
 
     try:
-        with json_path.open("r", encoding="utf-8") as f:
-            data = json.load(f)
+        raw = json_path.read_bytes()
+        data = orjson.loads(raw) if orjson is not None else json.loads(raw)
     except Exception:
         return
 
@@ -38,11 +66,76 @@ def _inject_cache_stats(json_path: Path, stdout: str) -> None:
     agg["cache_hits"] = hits
     agg["cache_misses"] = misses
 
-    with json_path.open("w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+    if orjson is not None:
+        out = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    else:
+        out = json.dumps(data, indent=2).encode("utf-8")
+
+    # Write to a sibling temp file and rename over the original so an
+    # interrupted run never leaves a truncated result behind.
+    fd, tmp = tempfile.mkstemp(dir=str(json_path.parent), prefix=f".{json_path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(out)
+        # mkstemp creates 0600; keep the permissions benchmark_recall gave it.
+        shutil.copymode(json_path, tmp)
+        os.replace(tmp, json_path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _run_one(
+    cfg: Dict[str, str], base_cmd: List[str], results_raw: Path, cwd: Path
+) -> Optional[Dict[str, Any]]:
+    """Run benchmark_recall for one cache policy and summarize its JSON."""
+    run_name = f"exp3_tiered_{cfg['name']}_nb20k_q2k_efs256"
+    json_out = results_raw / f"{run_name}.json"
+
+    cmd = base_cmd + [
+        "--cache-policy",
+        cfg["cache_policy"],
+        "--json-out",
+        str(json_out),
+    ]
+
+    stats = _run(cmd, cwd)
+    _inject_cache_stats(json_out, stats)
+
+    # Quick one-line summary from JSON
+    try:
+        with json_out.open("r", encoding="utf-8") as f:
+            data = json.load(f)
+    except Exception:
+        return None
+    agg = data.get("aggregate", {})
+
+    qps_search, qps_total = summary_qps(cfg, agg)
+
+    return {
+        "name": run_name,
+        "policy": cfg["cache_policy"],
+        "recall": agg.get("recall_at_k"),
+        "qps_search": qps_search,
+        "qps_total": qps_total,
+        "effective_qps": agg.get("effective_qps"),
+        "cache_hits": agg.get("cache_hits"),
+        "cache_misses": agg.get("cache_misses"),
+    }
 
 
 def main() -> int:
+    parser = argparse.ArgumentParser(description="Run Experiment 3 cache policy benchmarks")
+    parser.add_argument(
+        "--parallel",
+        action="store_true",
+        help="Run the LRU and LFU benchmarks concurrently (faster, but they compete for CPU)",
+    )
+    args = parser.parse_args()
+
     script_path = Path(__file__).resolve()
     exp_dir = script_path.parent.parent
     project_dir = exp_dir.parent.parent
@@ -70,77 +163,41 @@ def main() -> int:
         {"name": "lfu", "cache_policy": "lfu"},
     ]
 
-    summaries = []
-
-    for cfg in policies:
-        run_name = f"exp3_tiered_{cfg['name']}_nb20k_q2k_efs256"
-        json_out = results_raw / f"{run_name}.json"
-
-        cmd = [
-            str(bin_path),
-            "--mode",
-            "tiered",
-            "--num-base",
-            str(num_base),
-            "--num-queries",
-            str(num_queries),
-            "--dim",
-            str(dim),
-            "--k",
-            str(k),
-            "--ef-search",
-            str(ef_search),
-            "--M",
-            str(M),
-            "--ef-construction",
-            str(ef_construction),
-            "--seed",
-            str(seed),
-            "--cache-capacity",
-            str(cache_capacity),
-            "--cache-policy",
-            cfg["cache_policy"],
-            "--json-out",
-            str(json_out),
-        ]
-
-        stdout = _run(cmd, project_dir)
-        _inject_cache_stats(json_out, stdout)
-
-        # Quick one-line summary from JSON
-        try:
-            with json_out.open("r", encoding="utf-8") as f:
-                data = json.load(f)
-        except Exception:
-            continue
-        agg = data.get("aggregate", {})
-
-        num_q = agg.get("num_queries") or cfg.get("num_queries") or 0
-        search_s = agg.get("search_time_s")
-        qps_search = agg.get("qps_search")
-        if qps_search is None and num_q and search_s is not None:
-            try:
-                s = float(search_s)
-                if s > 0.0:
-                    qps_search = float(num_q) / s
-            except Exception:
-                qps_search = None
-        qps_total = agg.get("qps_total")
-        if qps_total is None:
-            qps_total = agg.get("qps")
-
-        summaries.append(
-            {
-                "name": run_name,
-                "policy": cfg["cache_policy"],
-                "recall": agg.get("recall_at_k"),
-                "qps_search": qps_search,
-                "qps_total": qps_total,
-                "effective_qps": agg.get("effective_qps"),
-                "cache_hits": agg.get("cache_hits"),
-                "cache_misses": agg.get("cache_misses"),
-            }
-        )
+    base_cmd = [
+        str(bin_path),
+        "--mode",
+        "tiered",
+        "--num-base",
+        str(num_base),
+        "--num-queries",
+        str(num_queries),
+        "--dim",
+        str(dim),
+        "--k",
+        str(k),
+        "--ef-search",
+        str(ef_search),
+        "--M",
+        str(M),
+        "--ef-construction",
+        str(ef_construction),
+        "--seed",
+        str(seed),
+        "--cache-capacity",
+        str(cache_capacity),
+    ]
+
+    def run(cfg: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        return _run_one(cfg, base_cmd, results_raw, project_dir)
+
+    # The runs are independent; worker threads just block on their child
+    # process. Off by default so QPS numbers are not skewed by contention.
+    if args.parallel:
+        with ThreadPoolExecutor(max_workers=len(policies)) as ex:
+            results = list(ex.map(run, policies))
+    else:
+        results = [run(cfg) for cfg in policies]
+    summaries = [s for s in results if s is not None]
 
     print("\n[run_experiment3] Summary of new JSON results:")
     for s in summaries:
@@ -8,85 +8,133 @@
 
 import argparse
 import json
+import sys
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, List, NamedTuple, Optional
+
+# Shared analyzer helpers live in the project-level scripts/ directory.
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "scripts"))
+
+from analyze_common import fast_glob, load_cached_rows  # noqa: E402
 
 try:
+    import matplotlib
+
+    matplotlib.use("Agg")
     import matplotlib.pyplot as plt  # type: ignore
     from matplotlib.ticker import FuncFormatter
+
     HAS_MPL = True
 except Exception:  # pragma: no cover
     HAS_MPL = False
 
+try:
+    import orjson  # type: ignore
+
+    _json_loads = orjson.loads
+except ImportError:  # pragma: no cover
+    _json_loads = json.loads
+
+
+class Row(NamedTuple):
+    """One Experiment 4 result file, flattened (fixed fields, no per-row dict)."""
+
+    file: str
+    mode: str
+    cache_capacity: Optional[int]
+    cache_frac: Optional[float]
+    num_vectors: Optional[int]
+    recall: Optional[float]
+    qps_search: Optional[float]
+    qps_total: Optional[float]
+    effective_qps: Optional[float]
+    reads: Optional[int]
+    bytes_read: Optional[int]
+    device_time_us: Optional[float]
+    reads_per_q: Optional[float]
+    bytes_per_q: Optional[float]
+    device_time_us_per_q: Optional[float]
+
+
+def _load_one(p: Path) -> Optional[Row]:
+    try:
+        # Raw bytes: orjson decodes UTF-8 itself and stdlib json accepts bytes.
+        data = _json_loads(p.read_bytes())
+    except Exception as e:  # pragma: no cover
+        print(f"[WARN] Failed to load {p}: {e}")
+        return None
+
+    cfg = data.get("config", {})
+    agg = data.get("aggregate", {})
+    io = agg.get("io", {})
 
-def load_results(paths: List[Path]) -> List[Dict[str, Any]]:
-    rows: List[Dict[str, Any]] = []
-    for p in paths:
+    num_q = agg.get("num_queries") or cfg.get("num_queries") or 0
+    num_vec = cfg.get("num_vectors")
+    cache_cap = cfg.get("cache_capacity")
+
+    search_s = agg.get("search_time_s")
+
+    qps_search = agg.get("qps_search")
+    if qps_search is None and num_q and search_s is not None:
         try:
-            with p.open("r", encoding="utf-8") as f:
-                data = json.load(f)
-        except Exception as e:  # pragma: no cover
-            print(f"[WARN] Failed to load {p}: {e}")
-            continue
-
-        cfg = data.get("config", {})
-        agg = data.get("aggregate", {})
-        io = agg.get("io", {})
-
-        num_q = agg.get("num_queries") or cfg.get("num_queries") or 0
-        num_vec = cfg.get("num_vectors")
-        cache_cap = cfg.get("cache_capacity")
-
-        search_s = agg.get("search_time_s")
-
-        qps_search = agg.get("qps_search")
-        if qps_search is None and num_q and search_s is not None:
-            try:
-                s = float(search_s)
-                if s > 0.0:
-                    qps_search = float(num_q) / s
-            except Exception:
-                qps_search = None
-
-        qps_total = agg.get("qps_total")
-        if qps_total is None:
-            qps_total = agg.get("qps")
-
-        reads = io.get("num_reads")
-        bytes_read = io.get("bytes_read")
-        dev_us = agg.get("device_time_us")
-
-        reads_per_q = (reads / num_q) if reads is not None and num_q else None
-        bytes_per_q = (bytes_read / num_q) if bytes_read is not None and num_q else None
-        dev_us_per_q = (dev_us / num_q) if dev_us is not None and num_q else None
-
-        cache_frac = None
-        if cache_cap is not None and num_vec:
-            cache_frac = float(cache_cap) / float(num_vec)
-
-        rows.append(
-            {
-                "file": p.name,
-                "mode": cfg.get("mode", ""),
-                "cache_capacity": cache_cap,
-                "cache_frac": cache_frac,
-                "num_vectors": num_vec,
-                "recall": agg.get("recall_at_k"),
-                "qps_search": qps_search,
-                "qps_total": qps_total,
-                "effective_qps": agg.get("effective_qps"),
-                "reads": reads,
-                "bytes_read": bytes_read,
-                "device_time_us": dev_us,
-                "reads_per_q": reads_per_q,
-                "bytes_per_q": bytes_per_q,
-                "device_time_us_per_q": dev_us_per_q,
-            }
-        )
-    return rows
+            s = float(search_s)
+            if s > 0.0:
+                qps_search = float(num_q) / s
+        except Exception:
+            qps_search = None
+
+    qps_total = agg.get("qps_total")
+    if qps_total is None:
+        qps_total = agg.get("qps")
+
+    reads = io.get("num_reads")
+    bytes_read = io.get("bytes_read")
+    dev_us = agg.get("device_time_us")
+
+    reads_per_q = (reads / num_q) if reads is not None and num_q else None
+    bytes_per_q = (bytes_read / num_q) if bytes_read is not None and num_q else None
+    dev_us_per_q = (dev_us / num_q) if dev_us is not None and num_q else None
+
+    cache_frac = None
+    if cache_cap is not None and num_vec:
+        cache_frac = float(cache_cap) / float(num_vec)
+
+    return Row(
+        file=p.name,
+        mode=cfg.get("mode", ""),
+        cache_capacity=cache_cap,
+        cache_frac=cache_frac,
+        num_vectors=num_vec,
+        recall=agg.get("recall_at_k"),
+        qps_search=qps_search,
+        qps_total=qps_total,
+        effective_qps=agg.get("effective_qps"),
+        reads=reads,
+        bytes_read=bytes_read,
+        device_time_us=dev_us,
+        reads_per_q=reads_per_q,
+        bytes_per_q=bytes_per_q,
+        device_time_us_per_q=dev_us_per_q,
+    )
+
+
+# Bump when _load_one's output changes so rows cached by older logic are
+# re-parsed instead of served.
+ROW_CACHE_SCHEMA = 1
 
 
-def print_table(rows: List[Dict[str, Any]]) -> None:
+def load_results(paths: List[Path], cache_path: Optional[Path] = None) -> List[Row]:
+    """Flatten result JSON files into rows, in input order.
+
+    When cache_path is given, rows are memoized there keyed by
+    (path, mtime_ns, size) under ROW_CACHE_SCHEMA, so unchanged files cost
+    only a stat() on re-runs.
+    """
+
+    return load_cached_rows(paths, _load_one, cache_path, ROW_CACHE_SCHEMA)
+
+
+def print_table(rows: List[Row]) -> None:
     if not rows:
         print("No Experiment 4 results to show.")
         return
@@ -105,26 +153,27 @@ def print_table(rows: List[Dict[str, Any]]) -> None:
         "dev_us/q",
     ]
 
-    print("\n=== Experiment 4 Summary (I/O Amplification vs Cache Size) ===")
-    print("\t".join(headers))
+    # Build every line first and emit the table with a single write.
+    lines = ["", "=== Experiment 4 Summary (I/O Amplification vs Cache Size) ===", "\t".join(headers)]
     for r in rows:
-        print(
+        lines.append(
             "\t".join(
                 [
-                    r["file"],
-                    str(r["mode"]),
-                    str(r["cache_capacity"]),
-                    f"{r['cache_frac']:.3f}" if r["cache_frac"] is not None else "",
-                    f"{r['recall']:.5f}" if r["recall"] is not None else "",
-                    f"{r['qps_search']:.3f}" if r["qps_search"] is not None else "",
-                    f"{r['qps_total']:.3f}" if r["qps_total"] is not None else "",
-                    f"{r['effective_qps']:.3f}" if r["effective_qps"] is not None else "",
-                    f"{r['reads_per_q']:.1f}" if r["reads_per_q"] is not None else "",
-                    f"{r['bytes_per_q']:.1f}" if r["bytes_per_q"] is not None else "",
-                    f"{r['device_time_us_per_q']:.2f}" if r["device_time_us_per_q"] is not None else "",
+                    r.file,
+                    str(r.mode),
+                    str(r.cache_capacity),
+                    f"{r.cache_frac:.3f}" if r.cache_frac is not None else "",
+                    f"{r.recall:.5f}" if r.recall is not None else "",
+                    f"{r.qps_search:.3f}" if r.qps_search is not None else "",
+                    f"{r.qps_total:.3f}" if r.qps_total is not None else "",
+                    f"{r.effective_qps:.3f}" if r.effective_qps is not None else "",
+                    f"{r.reads_per_q:.1f}" if r.reads_per_q is not None else "",
+                    f"{r.bytes_per_q:.1f}" if r.bytes_per_q is not None else "",
+                    f"{r.device_time_us_per_q:.2f}" if r.device_time_us_per_q is not None else "",
                 ]
             )
         )
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def _format_k(value: Any) -> str:
@@ -150,7 +199,7 @@ def _k_formatter(x: float, _pos) -> str:
     return _format_k(x)
 
 
-def make_plots(rows: List[Dict[str, Any]], out_dir: Path) -> None:
+def make_plots(rows: List[Row], out_dir: Path) -> None:
     if not HAS_MPL:
         print("[INFO] matplotlib not available; skipping Experiment 4 plots.")
         return
@@ -163,33 +212,36 @@ def make_plots(rows: List[Dict[str, Any]], out_dir: Path) -> None:
     tiered = [
         r
         for r in rows
-        if r["mode"] == "tiered" and r["cache_frac"] is not None and r["reads_per_q"] is not None
+        if r.mode == "tiered" and r.cache_frac is not None and r.reads_per_q is not None
     ]
     if not tiered:
         print("[INFO] No tiered runs with cache_frac to plot.")
         return
 
-    tiered = sorted(tiered, key=lambda r: float(r["cache_frac"]))
-    x = [float(r["cache_frac"]) for r in tiered]
-    reads_per_q = [r["reads_per_q"] for r in tiered]
-    bytes_per_q = [r["bytes_per_q"] for r in tiered]
-    dev_us_per_q = [r["device_time_us_per_q"] for r in tiered]
+    tiered = sorted(tiered, key=lambda r: float(r.cache_frac))
+    x = [float(r.cache_frac) for r in tiered]
+    reads_per_q = [r.reads_per_q for r in tiered]
+    bytes_per_q = [r.bytes_per_q for r in tiered]
+    dev_us_per_q = [r.device_time_us_per_q for r in tiered]
 
-    # Plot 1: reads per query vs cache fraction
+    # One Figure/Axes pair is reused for every plot; only the axes contents
+    # are cleared between saves.
     fig, ax = plt.subplots(figsize=(6, 4))
+    k_fmt = FuncFormatter(_k_formatter)
+
+    # Plot 1: reads per query vs cache fraction
     ax.plot(x, reads_per_q, marker="o", color="C0")
     ax.set_xlabel("Cache Fraction (Capacity / Num Vectors)")
     ax.set_ylabel("Reads per Query")
     ax.set_title("Experiment 4: Reads per Query vs Cache Fraction")
-    ax.yaxis.set_major_formatter(FuncFormatter(_k_formatter))
+    ax.yaxis.set_major_formatter(k_fmt)
     ax.grid(True, alpha=0.3)
     fig.tight_layout()
     fig.savefig(out_dir / "exp4_reads_per_query_vs_cache_frac.png", dpi=150)
-    plt.close(fig)
 
     # Plot 2: bytes per query vs cache fraction (reported in MiB/query for
     # readability).
-    fig, ax = plt.subplots(figsize=(6, 4))
+    ax.clear()
     mib_per_q = [
         (b / (1024.0 * 1024.0)) if b is not None else None
         for b in bytes_per_q
@@ -201,20 +253,20 @@ def make_plots(rows: List[Dict[str, Any]], out_dir: Path) -> None:
     ax.grid(True, alpha=0.3)
     fig.tight_layout()
     fig.savefig(out_dir / "exp4_bytes_per_query_vs_cache_frac.png", dpi=150)
-    plt.close(fig)
 
     # Plot 3: device time per query vs cache fraction (if available)
     if any(v is not None for v in dev_us_per_q):
-        fig, ax = plt.subplots(figsize=(6, 4))
+        ax.clear()
         ax.plot(x, dev_us_per_q, marker="o", color="C2")
         ax.set_xlabel("Cache Fraction (Capacity / Num Vectors)")
         ax.set_ylabel("Device Time per Query (µs)")
         ax.set_title("Experiment 4: Modeled Device Time per Query vs Cache Fraction")
-        ax.yaxis.set_major_formatter(FuncFormatter(_k_formatter))
+        ax.yaxis.set_major_formatter(k_fmt)
         ax.grid(True, alpha=0.3)
         fig.tight_layout()
         fig.savefig(out_dir / "exp4_device_time_per_query_vs_cache_frac.png", dpi=150)
-        plt.close(fig)
+
+    plt.close(fig)
 
 
 def main() -> int:
@@ -234,12 +286,15 @@ def main() -> int:
     exp_dir = script_path.parent.parent
 
     pattern = args.glob or "results/raw/exp4_*.json"
-    paths = sorted(exp_dir.glob(pattern))
+    if args.glob is None:
+        paths = fast_glob(exp_dir / "results" / "raw", "exp4_", ".json")
+    else:
+        paths = sorted(exp_dir.glob(pattern))
     if not paths:
         print(f"No JSON files found for pattern: {exp_dir / pattern}")
         return 0
 
-    rows = load_results(paths)
+    rows = load_results(paths, exp_dir / "results" / "raw" / ".cache" / "analyze_rows.pkl")
     print_table(rows)
 
     plots_dir = exp_dir / "results" / "plots"
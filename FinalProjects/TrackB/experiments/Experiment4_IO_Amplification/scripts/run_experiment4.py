@@ -4,6 +4,11 @@ import subprocess
 import sys
 from pathlib import Path
 
+# Shared runner helpers live in the project-level scripts/ directory.
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "scripts"))
+
+from run_common import summary_qps  # noqa: E402
+
 
 def _run(cmd, cwd: Path) -> None:
     print("\n[run_experiment4] exec:", " ".join(cmd))
@@ -106,18 +111,7 @@ def main() -> int:
         cfg = data.get("config", {})
         io = agg.get("io", {})
         num_q = agg.get("num_queries") or cfg.get("num_queries") or 0
-        search_s = agg.get("search_time_s")
-        qps_search = agg.get("qps_search")
-        if qps_search is None and num_q and search_s is not None:
-            try:
-                s = float(search_s)
-                if s > 0.0:
-                    qps_search = float(num_q) / s
-            except Exception:
-                qps_search = None
-        qps_total = agg.get("qps_total")
-        if qps_total is None:
-            qps_total = agg.get("qps")
+        qps_search, qps_total = summary_qps(cfg, agg)
         reads = io.get("num_reads")
         bytes_read = io.get("bytes_read")
         reads_per_q = (reads / num_q) if reads is not None and num_q else None
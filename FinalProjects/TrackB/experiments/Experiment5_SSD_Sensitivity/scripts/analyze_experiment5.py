@@ -7,66 +7,91 @@
 """
 
 import argparse
-import json
+import sys
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Optional
+
+# Shared analyzer helpers live in the project-level scripts/ directory.
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "scripts"))
+
+from analyze_common import fast_glob, load_cached_rows, load_sections  # noqa: E402
 
 try:
+    import matplotlib
+
+    matplotlib.use("Agg")
     import matplotlib.pyplot as plt  # type: ignore
     from matplotlib.ticker import FuncFormatter
+
     HAS_MPL = True
 except Exception:  # pragma: no cover
     HAS_MPL = False
 
 
-def load_results(paths: List[Path]) -> List[Dict[str, Any]]:
-    rows: List[Dict[str, Any]] = []
-    for p in paths:
+def _load_one(p: Path) -> Optional[Dict[str, Any]]:
+    try:
+        data = load_sections(p)
+    except Exception as e:  # pragma: no cover
+        print(f"[WARN] Failed to load {p}: {e}")
+        return None
+
+    cfg = data.get("config", {})
+    agg = data.get("aggregate", {})
+
+    num_q = agg.get("num_queries") or cfg.get("num_queries") or 0
+    dev_us = agg.get("device_time_us")
+    dev_us_per_q = (dev_us / num_q) if dev_us is not None and num_q else None
+
+    search_s = agg.get("search_time_s")
+    qps_search = agg.get("qps_search")
+    if qps_search is None and num_q and search_s is not None:
         try:
-            with p.open("r", encoding="utf-8") as f:
-                data = json.load(f)
-        except Exception as e:  # pragma: no cover
-            print(f"[WARN] Failed to load {p}: {e}")
-            continue
+            s = float(search_s)
+            if s > 0.0:
+                qps_search = float(num_q) / s
+        except Exception:
+            qps_search = None
+
+    qps_total = agg.get("qps_total")
+    if qps_total is None:
+        qps_total = agg.get("qps")
+
+    return {
+        "file": p.name,
+        "mode": cfg.get("mode", ""),
+        "ssd_base_latency_us": cfg.get("ssd_base_read_latency_us"),
+        "ssd_bw_GBps": cfg.get("ssd_internal_read_bandwidth_GBps"),
+        "ssd_num_channels": cfg.get("ssd_num_channels"),
+        "ssd_queue_depth": cfg.get("ssd_queue_depth_per_channel"),
+        "recall": agg.get("recall_at_k"),
+        "qps_search": qps_search,
+        "qps_total": qps_total,
+        "effective_qps": agg.get("effective_qps"),
+        "device_time_us": dev_us,
+        "device_time_us_per_q": dev_us_per_q,
+    }
 
-        cfg = data.get("config", {})
-        agg = data.get("aggregate", {})
-
-        num_q = agg.get("num_queries") or cfg.get("num_queries") or 0
-        dev_us = agg.get("device_time_us")
-        dev_us_per_q = (dev_us / num_q) if dev_us is not None and num_q else None
-
-        search_s = agg.get("search_time_s")
-        qps_search = agg.get("qps_search")
-        if qps_search is None and num_q and search_s is not None:
-            try:
-                s = float(search_s)
-                if s > 0.0:
-                    qps_search = float(num_q) / s
-            except Exception:
-                qps_search = None
-
-        qps_total = agg.get("qps_total")
-        if qps_total is None:
-            qps_total = agg.get("qps")
-
-        rows.append(
-            {
-                "file": p.name,
-                "mode": cfg.get("mode", ""),
-                "ssd_base_latency_us": cfg.get("ssd_base_read_latency_us"),
-                "ssd_bw_GBps": cfg.get("ssd_internal_read_bandwidth_GBps"),
-                "ssd_num_channels": cfg.get("ssd_num_channels"),
-                "ssd_queue_depth": cfg.get("ssd_queue_depth_per_channel"),
-                "recall": agg.get("recall_at_k"),
-                "qps_search": qps_search,
-                "qps_total": qps_total,
-                "effective_qps": agg.get("effective_qps"),
-                "device_time_us": dev_us,
-                "device_time_us_per_q": dev_us_per_q,
-            }
-        )
-    return rows
+
+# Bump when _load_one's output changes so rows cached by older logic are
+# re-parsed instead of served.
+ROW_CACHE_SCHEMA = 1
+
+
+def load_results(paths: List[Path], cache_path: Optional[Path] = None) -> List[Dict[str, Any]]:
+    """Flatten result JSON files into rows.
+
+    When cache_path is given, rows are memoized there keyed by
+    (path, mtime_ns, size) under ROW_CACHE_SCHEMA, so unchanged files cost
+    only a stat() on re-runs.
+    """
+
+    return load_cached_rows(paths, _load_one, cache_path, ROW_CACHE_SCHEMA)
+
+
+def _fmt(value: Any, spec: str) -> str:
+    """format(value, spec), or an empty cell for missing values."""
+
+    return "" if value is None else format(value, spec)
 
 
 def print_table(rows: List[Dict[str, Any]]) -> None:
@@ -88,10 +113,10 @@ def print_table(rows: List[Dict[str, Any]]) -> None:
         "dev_us/q",
     ]
 
-    print("\n=== Experiment 5 Summary (SSD Sensitivity) ===")
-    print("\t".join(headers))
+    # Build every line first and emit the table with a single write.
+    lines = ["", "=== Experiment 5 Summary (SSD Sensitivity) ===", "\t".join(headers)]
     for r in rows:
-        print(
+        lines.append(
             "\t".join(
                 [
                     r["file"],
@@ -100,14 +125,15 @@ def print_table(rows: List[Dict[str, Any]]) -> None:
                     str(r["ssd_bw_GBps"]),
                     str(r["ssd_num_channels"]),
                     str(r["ssd_queue_depth"]),
-                    f"{r['recall']:.5f}" if r["recall"] is not None else "",
-                    f"{r['qps_search']:.3f}" if r["qps_search"] is not None else "",
-                    f"{r['qps_total']:.3f}" if r["qps_total"] is not None else "",
-                    f"{r['effective_qps']:.3f}" if r["effective_qps"] is not None else "",
-                    f"{r['device_time_us_per_q']:.2f}" if r["device_time_us_per_q"] is not None else "",
+                    _fmt(r["recall"], ".5f"),
+                    _fmt(r["qps_search"], ".3f"),
+                    _fmt(r["qps_total"], ".3f"),
+                    _fmt(r["effective_qps"], ".3f"),
+                    _fmt(r["device_time_us_per_q"], ".2f"),
                 ]
             )
         )
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def _format_k(value: Any) -> str:
@@ -133,6 +159,53 @@ def _k_formatter(x: float, _pos) -> str:
     return _format_k(x)
 
 
+def _bar_panel(
+    ax,
+    x: List[int],
+    labels: List[str],
+    values: List[Any],
+    *,
+    color: str,
+    ylabel: str,
+    title: str,
+    formatter,
+    annotate: Callable[[float], str],
+) -> None:
+    """Draw one per-SSD-profile bar chart with headroom and value labels."""
+
+    bars = ax.bar(x, values, color=color)
+    ax.set_xticks(x)
+    ax.set_xticklabels(labels, rotation=0, ha="center")
+    ax.set_ylabel(ylabel)
+    ax.set_xlabel("SSD Profile (Latency / Bandwidth)")
+    ax.set_title(title)
+    ax.yaxis.set_major_formatter(formatter)
+    ax.grid(True, axis="y", alpha=0.3)
+
+    # Add headroom and annotate bars so relative differences remain visible.
+    if values:
+        try:
+            ymax = max(float(v) for v in values if v is not None)
+            if ymax > 0:
+                ax.set_ylim(0, ymax * 1.15)
+        except Exception:
+            pass
+
+    for bar in bars:
+        height = bar.get_height()
+        if height is None:
+            continue
+        ax.annotate(
+            annotate(height),
+            xy=(bar.get_x() + bar.get_width() / 2.0, height),
+            xytext=(0, 3),
+            textcoords="offset points",
+            ha="center",
+            va="bottom",
+            fontsize=8,
+        )
+
+
 def make_plots(rows: List[Dict[str, Any]], out_dir: Path) -> None:
     if not HAS_MPL:
         print("[INFO] matplotlib not available; skipping Experiment 5 plots.")
@@ -159,81 +232,44 @@ def make_plots(rows: List[Dict[str, Any]], out_dir: Path) -> None:
     eff_qps = [r["effective_qps"] for r in tiered]
     dev_us_per_q = [r["device_time_us_per_q"] for r in tiered]
 
-    # Plot 1: Effective QPS vs SSD profile
+    # One Figure/Axes pair is reused for both plots; only the axes contents
+    # are cleared between saves.
     fig, ax = plt.subplots(figsize=(7, 4))
-    bars_qps = ax.bar(x, eff_qps, color="C0")
-    ax.set_xticks(x)
-    ax.set_xticklabels(labels, rotation=0, ha="center")
-    ax.set_ylabel("Effective QPS")
-    ax.set_xlabel("SSD Profile (Latency / Bandwidth)")
-    ax.set_title("Experiment 5: Effective QPS vs SSD Profile")
-    ax.yaxis.set_major_formatter(FuncFormatter(_k_formatter))
-    ax.grid(True, axis="y", alpha=0.3)
-
-    # Add headroom and annotate bars so relative differences remain visible.
-    if eff_qps:
-        try:
-            ymax = max(float(v) for v in eff_qps if v is not None)
-            if ymax > 0:
-                ax.set_ylim(0, ymax * 1.15)
-        except Exception:
-            pass
-
-    for bar in bars_qps:
-        height = bar.get_height()
-        if height is None:
-            continue
-        ax.annotate(
-            f"{height:.1f}",
-            xy=(bar.get_x() + bar.get_width() / 2.0, height),
-            xytext=(0, 3),
-            textcoords="offset points",
-            ha="center",
-            va="bottom",
-            fontsize=8,
-        )
+    k_fmt = FuncFormatter(_k_formatter)
 
+    # Plot 1: Effective QPS vs SSD profile
+    _bar_panel(
+        ax,
+        x,
+        labels,
+        eff_qps,
+        color="C0",
+        ylabel="Effective QPS",
+        title="Experiment 5: Effective QPS vs SSD Profile",
+        formatter=k_fmt,
+        annotate=lambda h: f"{h:.1f}",
+    )
     fig.tight_layout()
     fig.subplots_adjust(bottom=0.35)
     fig.savefig(out_dir / "exp5_effective_qps_vs_ssd_profile.png", dpi=150)
-    plt.close(fig)
 
     # Plot 2: device time per query vs SSD profile
-    fig, ax = plt.subplots(figsize=(7, 4))
-    bars_dev = ax.bar(x, dev_us_per_q, color="C1")
-    ax.set_xticks(x)
-    ax.set_xticklabels(labels, rotation=0, ha="center")
-    ax.set_ylabel("Device Time per Query (µs)")
-    ax.set_xlabel("SSD Profile (Latency / Bandwidth)")
-    ax.set_title("Experiment 5: Modeled Device Time per Query vs SSD Profile")
-    ax.yaxis.set_major_formatter(FuncFormatter(_k_formatter))
-    ax.grid(True, axis="y", alpha=0.3)
-
-    if dev_us_per_q:
-        try:
-            ymax = max(float(v) for v in dev_us_per_q if v is not None)
-            if ymax > 0:
-                ax.set_ylim(0, ymax * 1.15)
-        except Exception:
-            pass
-
-    for bar in bars_dev:
-        height = bar.get_height()
-        if height is None:
-            continue
-        ax.annotate(
-            _format_k(height),
-            xy=(bar.get_x() + bar.get_width() / 2.0, height),
-            xytext=(0, 3),
-            textcoords="offset points",
-            ha="center",
-            va="bottom",
-            fontsize=8,
-        )
-
+    ax.clear()
+    _bar_panel(
+        ax,
+        x,
+        labels,
+        dev_us_per_q,
+        color="C1",
+        ylabel="Device Time per Query (µs)",
+        title="Experiment 5: Modeled Device Time per Query vs SSD Profile",
+        formatter=k_fmt,
+        annotate=_format_k,
+    )
     fig.tight_layout()
     fig.subplots_adjust(bottom=0.35)
     fig.savefig(out_dir / "exp5_device_time_per_query_vs_ssd_profile.png", dpi=150)
+
     plt.close(fig)
 
 
@@ -254,12 +290,15 @@ def main() -> int:
     exp_dir = script_path.parent.parent
 
     pattern = args.glob or "results/raw/exp5_*.json"
-    paths = sorted(exp_dir.glob(pattern))
+    if args.glob is None:
+        paths = fast_glob(exp_dir / "results" / "raw", "exp5_", ".json")
+    else:
+        paths = sorted(exp_dir.glob(pattern))
     if not paths:
         print(f"No JSON files found for pattern: {exp_dir / pattern}")
         return 0
 
-    rows = load_results(paths)
+    rows = load_results(paths, exp_dir / "results" / "raw" / ".cache" / "analyze_rows.pkl")
     print_table(rows)
 
     plots_dir = exp_dir / "results" / "plots"
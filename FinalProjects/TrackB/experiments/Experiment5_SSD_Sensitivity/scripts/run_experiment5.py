@@ -1,24 +1,51 @@
 #!/usr/bin/env python3
-import json
-import subprocess
+import argparse
 import sys
 from pathlib import Path
-
-
-def _run(cmd, cwd: Path) -> None:
-    print("\n[run_experiment5] exec:", " ".join(cmd))
-    proc = subprocess.run(cmd, cwd=str(cwd), text=True, capture_output=True)
-    if proc.returncode != 0:
-        if proc.stdout:
-            sys.stderr.write(proc.stdout)
-        if proc.stderr:
-            sys.stderr.write(proc.stderr)
-        raise SystemExit(proc.returncode)
-    if proc.stdout:
-        sys.stdout.write(proc.stdout)
+from typing import Optional
+
+# Shared runner helpers live in the project-level scripts/ directory.
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "scripts"))
+
+from run_common import load_result, print_summaries, run_all, summary_qps  # noqa: E402
+
+
+def _summary_line(p: Path) -> Optional[str]:
+    """One-line recall/QPS summary of a result JSON, or None if unreadable."""
+    data = load_result(p)
+    if data is None:
+        return None
+    cfg = data.get("config", {})
+    agg = data.get("aggregate", {})
+    qps_search, qps_total = summary_qps(cfg, agg)
+    num_q = agg.get("num_queries") or cfg.get("num_queries") or 0
+    dev_us = agg.get("device_time_us")
+    dev_us_per_q = (dev_us / num_q) if dev_us is not None and num_q else None
+    return (
+        f"  {p.name}: mode={cfg.get('mode')}, "
+        f"ssd_base_latency_us={cfg.get('ssd_base_read_latency_us')}, "
+        f"ssd_bw_GBps={cfg.get('ssd_internal_read_bandwidth_GBps')}, "
+        f"recall@k={agg.get('recall_at_k')}, qps_search={qps_search}, qps_total={qps_total}, "
+        f"effective_qps={agg.get('effective_qps')}, dev_us/q={dev_us_per_q}"
+    )
 
 
 def main() -> int:
+    p = argparse.ArgumentParser(description="Experiment 5: SSD sensitivity sweep")
+    p.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help=(
+            "Benchmark processes to run concurrently (default: 1). Concurrent runs "
+            "share cores, so their QPS is measured under contention."
+        ),
+    )
+    args = p.parse_args()
+
+    # Timed runs go one at a time unless --jobs opts into concurrency.
+    jobs = max(1, args.jobs)
+
     script_path = Path(__file__).resolve()
     exp_dir = script_path.parent.parent
     project_dir = exp_dir.parent.parent
@@ -93,6 +120,7 @@ def main() -> int:
             }
         )
 
+    cmds = []
     for cfg in runs:
         json_out = results_raw / f"{cfg['name']}.json"
         cmd = [
@@ -136,40 +164,14 @@ def main() -> int:
                 ]
             )
 
-        _run(cmd, project_dir)
+        cmds.append(cmd)
+
+    run_all(cmds, project_dir, "run_experiment5", jobs)
 
     # Quick sanity summary: print recall/QPS and modeled device time per query.
     print("\n[run_experiment5] Summary of new JSON results:")
-    for p in sorted(results_raw.glob("exp5_*.json")):
-        try:
-            with p.open("r", encoding="utf-8") as f:
-                data = json.load(f)
-        except Exception:
-            continue
-        cfg = data.get("config", {})
-        agg = data.get("aggregate", {})
-        num_q = agg.get("num_queries") or cfg.get("num_queries") or 0
-        search_s = agg.get("search_time_s")
-        qps_search = agg.get("qps_search")
-        if qps_search is None and num_q and search_s is not None:
-            try:
-                s = float(search_s)
-                if s > 0.0:
-                    qps_search = float(num_q) / s
-            except Exception:
-                qps_search = None
-        qps_total = agg.get("qps_total")
-        if qps_total is None:
-            qps_total = agg.get("qps")
-        dev_us = agg.get("device_time_us")
-        dev_us_per_q = (dev_us / num_q) if dev_us is not None and num_q else None
-        print(
-            f"  {p.name}: mode={cfg.get('mode')}, "
-            f"ssd_base_latency_us={cfg.get('ssd_base_read_latency_us')}, "
-            f"ssd_bw_GBps={cfg.get('ssd_internal_read_bandwidth_GBps')}, "
-            f"recall@k={agg.get('recall_at_k')}, qps_search={qps_search}, qps_total={qps_total}, "
-            f"effective_qps={agg.get('effective_qps')}, dev_us/q={dev_us_per_q}"
-        )
+    paths = sorted(results_raw.glob("exp5_*.json"))
+    print_summaries(paths, _summary_line)
 
     return 0
 
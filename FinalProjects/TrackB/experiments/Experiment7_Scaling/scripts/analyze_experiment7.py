@@ -1,96 +1,122 @@
 #!/usr/bin/env python3
 import argparse
-import json
+import sys
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
+
+# Shared analyzer helpers live in the project-level scripts/ directory.
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "scripts"))
+
+from analyze_common import fast_glob, load_cached_rows, load_sections  # noqa: E402
 
 try:
+    import matplotlib
+
+    matplotlib.use("Agg")
     import matplotlib.pyplot as plt  # type: ignore
     from matplotlib.ticker import FuncFormatter
+
     HAS_MPL = True
 except Exception:
     HAS_MPL = False
 
+
 BYTES_PER_GB = 1024**3
 
 
-def load_results(paths: List[Path]) -> List[Dict[str, Any]]:
-    rows: List[Dict[str, Any]] = []
-    for p in paths:
-        try:
-            with p.open("r", encoding="utf-8") as f:
-                data = json.load(f)
-        except Exception as e:
-            print(f"[WARN] Failed to load {p}: {e}")
-            continue
-
-        cfg = data.get("config", {})
-        agg = data.get("aggregate", {})
-
-        mode = cfg.get("mode")
-        num_vec = cfg.get("num_vectors")
-        dim = cfg.get("dimension")
-        cache_cap = cfg.get("cache_capacity")
-
-        build_s = agg.get("build_time_s")
-        search_s = agg.get("search_time_s")
-        num_q = agg.get("num_queries")
-
-        qps_search = agg.get("qps_search")
-        if qps_search is None and num_q is not None and search_s is not None:
-            try:
-                s = float(search_s)
-                if s > 0.0:
-                    qps_search = float(num_q) / s
-            except Exception:
-                qps_search = None
-        if qps_search is None:
-            qps_search = agg.get("qps")
-
-        qps_total = agg.get("qps_total")
-        if qps_total is None and num_q is not None and build_s is not None and search_s is not None:
-            try:
-                t = float(build_s) + float(search_s)
-                if t > 0.0:
-                    qps_total = float(num_q) / t
-            except Exception:
-                qps_total = None
-        if qps_total is None:
-            qps_total = agg.get("qps")
-
-        effective_qps = agg.get("effective_qps")
-        recall = agg.get("recall_at_k")
-
-        approx_index_bytes = None
-        if num_vec is not None and dim is not None:
-            approx_index_bytes = int(num_vec) * int(dim) * 4
-
-        cache_frac = None
-        if mode == "tiered" and num_vec and cache_cap is not None:
-            cache_frac = float(cache_cap) / float(num_vec)
-
-        rows.append(
-            {
-                "file": p.name,
-                "mode": mode,
-                "num_vectors": num_vec,
-                "dimension": dim,
-                "cache_capacity": cache_cap,
-                "cache_frac": cache_frac,
-                "build_time_s": build_s,
-                "search_time_s": search_s,
-                "qps_search": qps_search,
-                "qps_total": qps_total,
-                "effective_qps": effective_qps,
-                "recall_at_k": recall,
-                "approx_index_gb": (approx_index_bytes / BYTES_PER_GB) if approx_index_bytes else None,
-            }
-        )
+def _load_one(p: Path) -> Optional[Dict[str, Any]]:
+    try:
+        data = load_sections(p)
+    except Exception as e:
+        print(f"[WARN] Failed to load {p}: {e}")
+        return None
+
+    cfg = data.get("config", {})
+    agg = data.get("aggregate", {})
+
+    mode = cfg.get("mode")
+    num_vec = cfg.get("num_vectors")
+    dim = cfg.get("dimension")
+    cache_cap = cfg.get("cache_capacity")
 
+    build_s = agg.get("build_time_s")
+    search_s = agg.get("search_time_s")
+    num_q = agg.get("num_queries")
+
+    qps_search = agg.get("qps_search")
+    if qps_search is None and num_q is not None and search_s is not None:
+        try:
+            s = float(search_s)
+            if s > 0.0:
+                qps_search = float(num_q) / s
+        except Exception:
+            qps_search = None
+    if qps_search is None:
+        qps_search = agg.get("qps")
+
+    qps_total = agg.get("qps_total")
+    if qps_total is None and num_q is not None and build_s is not None and search_s is not None:
+        try:
+            t = float(build_s) + float(search_s)
+            if t > 0.0:
+                qps_total = float(num_q) / t
+        except Exception:
+            qps_total = None
+    if qps_total is None:
+        qps_total = agg.get("qps")
+
+    effective_qps = agg.get("effective_qps")
+    recall = agg.get("recall_at_k")
+
+    approx_index_bytes = None
+    if num_vec is not None and dim is not None:
+        approx_index_bytes = int(num_vec) * int(dim) * 4
+
+    cache_frac = None
+    if mode == "tiered" and num_vec and cache_cap is not None:
+        cache_frac = float(cache_cap) / float(num_vec)
+
+    return {
+        "file": p.name,
+        "mode": mode,
+        "num_vectors": num_vec,
+        "dimension": dim,
+        "cache_capacity": cache_cap,
+        "cache_frac": cache_frac,
+        "build_time_s": build_s,
+        "search_time_s": search_s,
+        "qps_search": qps_search,
+        "qps_total": qps_total,
+        "effective_qps": effective_qps,
+        "recall_at_k": recall,
+        "approx_index_gb": (approx_index_bytes / BYTES_PER_GB) if approx_index_bytes else None,
+    }
+
+
+# Bump when _load_one's output changes so rows cached by older logic are
+# re-parsed instead of served.
+ROW_CACHE_SCHEMA = 1
+
+
+def load_results(paths: List[Path], cache_path: Optional[Path] = None) -> List[Dict[str, Any]]:
+    """Flatten result JSON files into rows.
+
+    When cache_path is given, rows are memoized there keyed by
+    (path, mtime_ns, size) under ROW_CACHE_SCHEMA, so unchanged files cost
+    only a stat() on re-runs.
+    """
+
+    rows = load_cached_rows(paths, _load_one, cache_path, ROW_CACHE_SCHEMA)
     rows.sort(key=lambda r: (int(r["num_vectors"] or 0), str(r["mode"])))
     return rows
 
 
+def _fmt(value: Any, spec: str) -> str:
+    """format(value, spec), or an empty cell for missing values."""
+
+    return "" if value is None else format(value, spec)
+
+
 def print_table(rows: List[Dict[str, Any]]) -> None:
     if not rows:
         print("No Experiment 7 results to show.")
@@ -109,25 +135,26 @@ def print_table(rows: List[Dict[str, Any]]) -> None:
         "approx_index_gb",
     ]
 
-    print("\n=== Experiment 7 Summary (Scaling) ===")
-    print("\t".join(headers))
+    # Build every line first and emit the table with a single write.
+    lines = ["", "=== Experiment 7 Summary (Scaling) ===", "\t".join(headers)]
     for r in rows:
-        print(
+        lines.append(
             "\t".join(
                 [
                     r["file"],
                     str(r["mode"]),
                     str(r["num_vectors"]),
-                    f"{r['cache_frac']:.3f}" if r["cache_frac"] is not None else "",
-                    f"{r['build_time_s']:.3f}" if r["build_time_s"] is not None else "",
-                    f"{r['qps_search']:.3f}" if r["qps_search"] is not None else "",
-                    f"{r['qps_total']:.3f}" if r["qps_total"] is not None else "",
-                    f"{r['effective_qps']:.3f}" if r["effective_qps"] is not None else "",
-                    f"{r['recall_at_k']:.5f}" if r["recall_at_k"] is not None else "",
-                    f"{r['approx_index_gb']:.3f}" if r["approx_index_gb"] is not None else "",
+                    _fmt(r["cache_frac"], ".3f"),
+                    _fmt(r["build_time_s"], ".3f"),
+                    _fmt(r["qps_search"], ".3f"),
+                    _fmt(r["qps_total"], ".3f"),
+                    _fmt(r["effective_qps"], ".3f"),
+                    _fmt(r["recall_at_k"], ".5f"),
+                    _fmt(r["approx_index_gb"], ".3f"),
                 ]
             )
         )
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def _format_k(value: Any) -> str:
@@ -166,6 +193,16 @@ def _mode_label(mode: Any) -> str:
     return str(mode)
 
 
+def _group_by_mode(rows: List[Dict[str, Any]], metric: str) -> Dict[Any, List[Dict[str, Any]]]:
+    """Rows with num_vectors and `metric` set, grouped by mode in one pass (row order kept)."""
+
+    groups: Dict[Any, List[Dict[str, Any]]] = {}
+    for r in rows:
+        if r["num_vectors"] and r[metric] is not None:
+            groups.setdefault(r["mode"], []).append(r)
+    return groups
+
+
 def make_plots(rows: List[Dict[str, Any]], out_dir: Path) -> None:
     if not HAS_MPL:
         print("[INFO] matplotlib not available; skipping Experiment 7 plots.")
@@ -175,11 +212,11 @@ def make_plots(rows: List[Dict[str, Any]], out_dir: Path) -> None:
 
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    valid = [r for r in rows if r["num_vectors"] and r["build_time_s"] is not None]
-    if valid:
+    by_mode = _group_by_mode(rows, "build_time_s")
+    if by_mode:
         fig, ax = plt.subplots(figsize=(7, 4))
-        for mode in sorted(set(r["mode"] for r in valid)):
-            pts = [r for r in valid if r["mode"] == mode]
+        for mode in sorted(by_mode):
+            pts = by_mode[mode]
             x = [int(r["num_vectors"]) for r in pts]
             y = [float(r["build_time_s"]) for r in pts]
             ax.plot(x, y, marker="o", label=_mode_label(mode))
@@ -196,11 +233,11 @@ def make_plots(rows: List[Dict[str, Any]], out_dir: Path) -> None:
         fig.savefig(out_dir / "exp7_build_time_vs_num_vectors.png", dpi=150)
         plt.close(fig)
 
-    valid = [r for r in rows if r["num_vectors"] and r["effective_qps"] is not None]
-    if valid:
+    by_mode = _group_by_mode(rows, "effective_qps")
+    if by_mode:
         fig, ax = plt.subplots(figsize=(7, 4))
-        for mode in sorted(set(r["mode"] for r in valid)):
-            pts = [r for r in valid if r["mode"] == mode]
+        for mode in sorted(by_mode):
+            pts = by_mode[mode]
             x = [int(r["num_vectors"]) for r in pts]
             y = [float(r["effective_qps"]) for r in pts]
             ax.plot(x, y, marker="o", label=_mode_label(mode))
@@ -234,12 +271,15 @@ def main() -> int:
     exp_dir = script_path.parent.parent
 
     pattern = args.glob or "results/raw/exp7_*.json"
-    paths = sorted(exp_dir.glob(pattern))
+    if args.glob is None:
+        paths = fast_glob(exp_dir / "results" / "raw", "exp7_", ".json")
+    else:
+        paths = sorted(exp_dir.glob(pattern))
     if not paths:
         print(f"No JSON files found for pattern: {exp_dir / pattern}")
         return 0
 
-    rows = load_results(paths)
+    rows = load_results(paths, exp_dir / "results" / "raw" / ".cache" / "analyze_rows.pkl")
     print_table(rows)
 
     plots_dir = exp_dir / "results" / "plots"
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""Helpers shared by the experiment analyze_experiment*.py scripts.
+
+The analyzers import this from the project-level scripts/ directory (see the
+sys.path setup at the top of each one), the same way run_experiment0 uses
+compare_hnswlib_sift.
+"""
+
+import json
+import os
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import orjson  # type: ignore
+
+    _json_loads = orjson.loads
+except ImportError:  # pragma: no cover
+    _json_loads = json.loads
+
+try:
+    import ijson  # type: ignore
+
+    HAS_IJSON = True
+except Exception:  # pragma: no cover
+    HAS_IJSON = False
+
+CacheKey = Tuple[str, int, int]
+
+# Only these top-level sections are consumed; everything else in a log is
+# skipped by the streaming path.
+SECTIONS = ("config", "aggregate")
+
+# Logs at or below this size are parsed whole. ijson's streaming only wins
+# once per-query data makes a log large: on the ~1 KB result files orjson
+# takes about 8 us against ijson's 24 us, and the crossover is near 200 KB.
+STREAM_MIN_BYTES = 256 * 1024
+
+
+def fast_glob(root: Path, prefix: str, suffix: str) -> List[Path]:
+    """Non-recursive prefix*suffix match via one os.scandir pass.
+
+    Like Path.glob, hidden files are skipped even when prefix is empty. Only
+    matching entries become Path objects, which keeps large raw/ directories
+    cheap.
+    """
+
+    try:
+        with os.scandir(root) as it:
+            return sorted(
+                Path(root, e.name)
+                for e in it
+                if e.name.startswith(prefix)
+                and e.name.endswith(suffix)
+                and not e.name.startswith(".")
+                and e.is_file()
+            )
+    except FileNotFoundError:
+        return []
+
+
+def load_sections(p: Path) -> Dict[str, Any]:
+    """Return just the top-level config/aggregate objects of a result JSON.
+
+    With ijson and a log larger than STREAM_MIN_BYTES, the file is streamed
+    as raw bytes and parsing stops once both sections have been seen;
+    otherwise it is parsed whole (orjson when available).
+    """
+
+    with open(p, "rb", buffering=1 << 16) as f:
+        if HAS_IJSON and os.fstat(f.fileno()).st_size > STREAM_MIN_BYTES:
+            out: Dict[str, Any] = {}
+            for key, value in ijson.kvitems(f, "", use_float=True):
+                if key in SECTIONS:
+                    out[key] = value
+                    if len(out) == len(SECTIONS):
+                        break
+            return out
+        # Parse raw bytes: orjson decodes UTF-8 itself, and stdlib json
+        # accepts bytes too, so the text-decode pass is skipped either way.
+        data = _json_loads(f.read())
+    return {key: data[key] for key in SECTIONS if key in data}
+
+
+def _read_row_cache(cache_path: Optional[Path], schema: int) -> Dict[CacheKey, Any]:
+    if cache_path is None:
+        return {}
+    try:
+        with cache_path.open("rb") as f:
+            payload = pickle.load(f)
+    except Exception:
+        return {}
+    # A cache from another schema (or the older unversioned layout) is
+    # dropped wholesale rather than trusted row by row.
+    if not isinstance(payload, dict) or payload.get("schema") != schema:
+        return {}
+    rows = payload.get("rows")
+    return rows if isinstance(rows, dict) else {}
+
+
+def load_cached_rows(
+    paths: List[Path],
+    parse: Callable[[Path], Any],
+    cache_path: Optional[Path],
+    schema: int,
+) -> List[Any]:
+    """Parse each path with `parse`, memoizing the results in cache_path.
+
+    Entries are keyed by (path, mtime_ns, size), so unchanged files cost only
+    a stat() on re-runs. `schema` is stored with the rows; callers bump it
+    whenever `parse` changes what it returns so old rows are never served.
+    Returns the parsed values in input order, skipping files that could not
+    be read or parsed to None.
+    """
+
+    if not paths:
+        return []
+    cache = _read_row_cache(cache_path, schema)
+
+    def load(p: Path) -> Tuple[Optional[CacheKey], Any]:
+        try:
+            st = p.stat()
+        except OSError as e:  # pragma: no cover - diagnostics only
+            print(f"[WARN] Failed to stat {p}: {e}")
+            return None, None
+        key = (str(p), st.st_mtime_ns, st.st_size)
+        if key in cache:
+            return key, cache[key]
+        try:
+            return key, parse(p)
+        except Exception as e:  # pragma: no cover - diagnostics only
+            print(f"[WARN] Failed to load {p}: {e}")
+            return None, None
+
+    # Files are independent; threads overlap the blocking reads (which
+    # release the GIL) while map() keeps input order.
+    with ThreadPoolExecutor(max_workers=min(32, len(paths))) as ex:
+        entries = [(key, row) for key, row in ex.map(load, paths) if row is not None]
+
+    # Rewrite when the file set changed or any file had to be re-parsed.
+    fresh = dict(entries)
+    stale = fresh.keys() != cache.keys() or any(cache.get(k) is not r for k, r in entries)
+    if cache_path is not None and stale:
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with cache_path.open("wb") as f:
+                pickle.dump({"schema": schema, "rows": fresh}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except OSError as e:  # pragma: no cover - diagnostics only
+            print(f"[WARN] Failed to write row cache {cache_path}: {e}")
+
+    return [row for _key, row in entries]
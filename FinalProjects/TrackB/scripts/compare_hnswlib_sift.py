@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 import argparse
+import os
 import time
-from typing import Tuple
+from typing import Any, Dict, Optional, Tuple
 
 import numpy as np
 
@@ -11,52 +12,43 @@ except ImportError as e:
     raise SystemExit("hnswlib is required. Install with `pip install hnswlib`.") from e
 
 
-def read_fvecs(path: str) -> np.ndarray:
-    """Load a fvecs file into a float32 numpy array of shape (n, d)."""
-    with open(path, "rb") as f:
-        data = f.read()
-    if not data:
-        raise ValueError(f"Empty fvecs file: {path}")
-
-    # Each vector: int32 dim + dim * float32
-    dim = np.frombuffer(data, dtype=np.int32, count=1)[0]
+def _map_vecs(path: str, kind: str) -> np.ndarray:
+    """Memory-map a *vecs file and return the (n, dim) payload as an int32 view.
+
+    Each record is an int32 dim followed by dim 4-byte values; the leading
+    column is sliced off without copying.
+    """
+    size = os.path.getsize(path)
+    if size == 0:
+        raise ValueError(f"Empty {kind} file: {path}")
+
+    mm = np.memmap(path, dtype=np.int32, mode="r")
+    dim = int(mm[0])
     if dim <= 0:
-        raise ValueError(f"Invalid dim {dim} in fvecs file {path}")
+        raise ValueError(f"Invalid dim {dim} in {kind} file {path}")
 
     record_size = 4 + dim * 4
-    if len(data) % record_size != 0:
+    if size % record_size != 0:
         raise ValueError(
-            f"File size {len(data)} not divisible by record size {record_size} for dim {dim}"
+            f"File size {size} not divisible by record size {record_size} for dim {dim}"
         )
 
-    n = len(data) // record_size
-    arr = np.frombuffer(data, dtype=np.int32).reshape(n, 1 + dim)
-    # First column is dim, remaining are floats
-    vecs = arr[:, 1:].view(np.float32)
-    return vecs.copy()
+    n = size // record_size
+    return mm.reshape(n, 1 + dim)[:, 1:]
 
 
-def read_ivecs(path: str) -> np.ndarray:
-    """Load an ivecs file into an int32 numpy array of shape (n, k)."""
-    with open(path, "rb") as f:
-        data = f.read()
-    if not data:
-        raise ValueError(f"Empty ivecs file: {path}")
+def read_fvecs(path: str) -> np.ndarray:
+    """Memory-map a fvecs file as a read-only float32 array of shape (n, d).
 
-    dim = np.frombuffer(data, dtype=np.int32, count=1)[0]
-    if dim <= 0:
-        raise ValueError(f"Invalid dim {dim} in ivecs file {path}")
+    Nothing is read until rows are touched, so slicing a SIFT1M subset only
+    pages in that subset; hnswlib copies into its own storage on add_items.
+    """
+    return _map_vecs(path, "fvecs").view(np.float32)
 
-    record_size = 4 + dim * 4
-    if len(data) % record_size != 0:
-        raise ValueError(
-            f"File size {len(data)} not divisible by record size {record_size} for dim {dim}"
-        )
 
-    n = len(data) // record_size
-    arr = np.frombuffer(data, dtype=np.int32).reshape(n, 1 + dim)
-    ids = arr[:, 1:]
-    return ids.copy()
+def read_ivecs(path: str) -> np.ndarray:
+    """Memory-map an ivecs file as a read-only int32 array of shape (n, k)."""
+    return _map_vecs(path, "ivecs")
 
 
 def compute_recall_at_k(
@@ -85,6 +77,142 @@ def compute_recall_at_k(
     return hits / float(total)
 
 
+def load_dataset(
+    base_path: str,
+    query_path: str,
+    num_base: int,
+    num_queries: int,
+    dim: int = 128,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Load the first num_base base vectors and num_queries queries.
+
+    Counts are clamped to what the files actually contain.
+    """
+
+    base = read_fvecs(base_path)
+    if base.shape[1] != dim:
+        raise SystemExit(f"Base dim mismatch: expected {dim}, got {base.shape[1]}")
+    base = base[: min(num_base, base.shape[0])]
+
+    queries = read_fvecs(query_path)
+    if queries.shape[1] != dim:
+        raise SystemExit(f"Query dim mismatch: expected {dim}, got {queries.shape[1]}")
+    queries = queries[: min(num_queries, queries.shape[0])]
+
+    return base, queries
+
+
+def load_groundtruth(path: str, num_base: int, num_queries: int) -> np.ndarray:
+    """Load ivecs groundtruth, masking ids outside [0, num_base) with -1."""
+
+    return mask_groundtruth(read_ivecs(path), num_base, num_queries)
+
+
+def mask_groundtruth(gt_full: np.ndarray, num_base: int, num_queries: int) -> np.ndarray:
+    """Trim full groundtruth to num_queries rows and the [0, num_base) subset."""
+
+    if gt_full.shape[0] < num_queries:
+        raise SystemExit(
+            f"Groundtruth queries {gt_full.shape[0]} < num_queries {num_queries}"
+        )
+    gt_full = gt_full[:num_queries]
+    # Filter to indices within the subset [0, num_base)
+    mask = gt_full < num_base
+    # Replace out-of-range with -1 and drop them when computing recall
+    return np.where(mask, gt_full, -1)
+
+
+def compute_bruteforce_gt(base: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    """Exact L2 top-k via ||q||^2 + ||b||^2 - 2 q.b (only feasible for small bases)."""
+
+    q_norms = np.sum(queries ** 2, axis=1, keepdims=True)
+    b_norms = np.sum(base ** 2, axis=1, keepdims=True).T
+    dists = q_norms + b_norms - 2.0 * np.matmul(queries, base.T)
+    order = np.argsort(dists, axis=1)
+    return order[:, :k]
+
+
+def build_index(
+    base: np.ndarray, M: int, ef_construction: int, num_threads: int = -1
+) -> Tuple[Any, float]:
+    """Build an hnswlib L2 index over base; returns (index, build_time_s).
+
+    Only M and ef_construction shape the graph, so one index can serve any
+    number of ef_search values via search_index. num_threads<=0 keeps the
+    hnswlib default (all cores); otherwise it sticks to the index for queries.
+    """
+
+    num_base, dim = base.shape
+    index = hnswlib.Index(space="l2", dim=dim)
+    if num_threads > 0:
+        index.set_num_threads(num_threads)
+
+    t0 = time.time()
+    index.init_index(max_elements=num_base, ef_construction=ef_construction, M=M)
+    index.add_items(base, ids=np.arange(num_base, dtype=np.int32))
+    build_time = time.time() - t0
+    return index, build_time
+
+
+def search_index(
+    index: Any,
+    queries: np.ndarray,
+    gt: Optional[np.ndarray],
+    ef_search: int,
+    k: int,
+    build_time: float,
+) -> Dict[str, Any]:
+    """Search queries at ef_search and return metrics.
+
+    The returned dict carries recall_at_k, build/search times, both QPS
+    flavours, and the raw neighbor labels (under "labels").
+    """
+
+    num_base = index.get_current_count()
+    num_queries = queries.shape[0]
+
+    index.set_ef(ef_search)
+
+    t1 = time.time()
+    labels, _ = index.knn_query(queries, k=k)
+    search_time = time.time() - t1
+
+    # Compute recall, ignoring gt entries that were -1 (out-of-range)
+    if gt is not None:
+        # Replace -1 with a large dummy id that won't match
+        gt_eval = np.where(gt >= 0, gt, num_base + 1)
+        recall = compute_recall_at_k(gt_eval, labels, k)
+    else:
+        recall = 0.0
+
+    qps_total = num_queries / (build_time + search_time)
+    qps_search = num_queries / search_time if search_time > 0 else 0.0
+
+    return {
+        "recall_at_k": recall,
+        "build_time_s": build_time,
+        "search_time_s": search_time,
+        "qps_total": qps_total,
+        "qps_search": qps_search,
+        "labels": labels,
+    }
+
+
+def run_hnsw(
+    base: np.ndarray,
+    queries: np.ndarray,
+    gt: Optional[np.ndarray],
+    M: int,
+    ef_construction: int,
+    ef_search: int,
+    k: int,
+) -> Dict[str, Any]:
+    """Build an hnswlib index over base, search queries, and return metrics."""
+
+    index, build_time = build_index(base, M, ef_construction)
+    return search_index(index, queries, gt, ef_search, k, build_time)
+
+
 def main() -> None:
     p = argparse.ArgumentParser(description="Compare hnswlib on SIFT subsets")
     p.add_argument("--base", required=True, help="Path to sift_base.fvecs")
@@ -106,91 +234,37 @@ def main() -> None:
     args = p.parse_args()
 
     print("[compare_hnswlib_sift] loading base from", args.base)
-    base = read_fvecs(args.base)
-    if base.shape[1] != args.dim:
-        raise SystemExit(f"Base dim mismatch: expected {args.dim}, got {base.shape[1]}")
-
-    num_base = min(args.num_base, base.shape[0])
-    base = base[:num_base]
-    print(f"  using num_base={num_base}")
-
     print("[compare_hnswlib_sift] loading queries from", args.query)
-    queries = read_fvecs(args.query)
-    if queries.shape[1] != args.dim:
-        raise SystemExit(f"Query dim mismatch: expected {args.dim}, got {queries.shape[1]}")
-
-    num_queries = min(args.num_queries, queries.shape[0])
-    queries = queries[:num_queries]
+    base, queries = load_dataset(
+        args.base, args.query, args.num_base, args.num_queries, args.dim
+    )
+    num_base = base.shape[0]
+    num_queries = queries.shape[0]
+    print(f"  using num_base={num_base}")
     print(f"  using num_queries={num_queries}")
 
-    gt = None
     if args.groundtruth:
         print("[compare_hnswlib_sift] loading groundtruth from", args.groundtruth)
-        gt_full = read_ivecs(args.groundtruth)
-        if gt_full.shape[0] < num_queries:
-            raise SystemExit(
-                f"Groundtruth queries {gt_full.shape[0]} < num_queries {num_queries}"
-            )
-        gt_full = gt_full[:num_queries]
-        # Filter to indices within the subset [0, num_base)
-        mask = gt_full < num_base
-        # Replace out-of-range with -1 and drop them when computing recall
-        gt = np.where(mask, gt_full, -1)
+        gt = load_groundtruth(args.groundtruth, num_base, num_queries)
     else:
         print("[compare_hnswlib_sift] no groundtruth provided; will compute brute-force GT")
-        # Brute-force distances for ground truth (only feasible for small num_base)
-        dists = np.matmul(
-            queries,
-            base.T,
-        )  # cosine/IP would need different handling; here we use L2 via norms
-        # For L2, we actually want squared distances; but for ranking, any monotone
-        # transform is fine. If you want exact L2, compute ||q-b||^2 explicitly.
-        # Here, reuse a simple implementation for clarity:
-        q_norms = np.sum(queries ** 2, axis=1, keepdims=True)
-        b_norms = np.sum(base ** 2, axis=1, keepdims=True).T
-        dists = q_norms + b_norms - 2.0 * np.matmul(queries, base.T)
-        order = np.argsort(dists, axis=1)
-        gt = order[:, : args.k]
-
-    print("[compare_hnswlib_sift] building hnswlib index...")
-    index = hnswlib.Index(space="l2", dim=args.dim)
+        gt = compute_bruteforce_gt(base, queries, args.k)
 
-    t0 = time.time()
-    index.init_index(max_elements=num_base, ef_construction=args.ef_construction, M=args.M)
-    index.add_items(base, ids=np.arange(num_base, dtype=np.int32))
-    build_time = time.time() - t0
-    print(f"  build_time_s={build_time:.4f}")
-
-    index.set_ef(args.ef_search)
-
-    print("[compare_hnswlib_sift] searching...")
-    t1 = time.time()
-    labels, _ = index.knn_query(queries, k=args.k)
-    search_time = time.time() - t1
+    print("[compare_hnswlib_sift] building hnswlib index and searching...")
+    res = run_hnsw(base, queries, gt, args.M, args.ef_construction, args.ef_search, args.k)
 
     if args.neighbors_out:
         with open(args.neighbors_out, "w") as f:
-            for row in labels:
+            for row in res["labels"]:
                 f.write(" ".join(str(int(x)) for x in row))
                 f.write("\n")
 
-    # Compute recall, ignoring gt entries that were -1 (out-of-range)
-    if gt is not None:
-        # Replace -1 with a large dummy id that won't match
-        gt_eval = np.where(gt >= 0, gt, num_base + 1)
-        recall = compute_recall_at_k(gt_eval, labels, args.k)
-    else:
-        recall = 0.0
-
-    qps_total = num_queries / (build_time + search_time)
-    qps_search = num_queries / search_time if search_time > 0 else 0.0
-
     print("[compare_hnswlib_sift] results:")
-    print(f"  recall@{args.k} = {recall:.6f}")
-    print(f"  build_time_s = {build_time:.4f}")
-    print(f"  search_time_s = {search_time:.4f}")
-    print(f"  total_QPS = {qps_total:.3f}")
-    print(f"  search_QPS = {qps_search:.3f}")
+    print(f"  recall@{args.k} = {res['recall_at_k']:.6f}")
+    print(f"  build_time_s = {res['build_time_s']:.4f}")
+    print(f"  search_time_s = {res['search_time_s']:.4f}")
+    print(f"  total_QPS = {res['qps_total']:.3f}")
+    print(f"  search_QPS = {res['qps_search']:.3f}")
 
 
 if __name__ == "__main__":
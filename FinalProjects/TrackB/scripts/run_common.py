@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Helpers shared by the experiment run_experiment*.py scripts.
+
+The run scripts import this from the project-level scripts/ directory (see
+the sys.path setup at the top of each one), the same way the analyzers use
+analyze_common.
+"""
+
+import json
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+def run(cmd: List[str], cwd: Path, tag: str, prefix: str = "") -> None:
+    """Run one benchmark command, forwarding its output as it arrives.
+
+    Each forwarded line starts with `prefix`; exits with the child's return
+    code if it fails.
+    """
+
+    print(f"\n[{tag}] exec:", " ".join(cmd))
+    # Forward the child's output line by line as it arrives instead of
+    # buffering all of it until exit.
+    with subprocess.Popen(
+        cmd,
+        cwd=str(cwd),
+        text=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        bufsize=1,
+    ) as proc:
+        for line in proc.stdout:
+            sys.stdout.write(prefix + line)
+        rc = proc.wait()
+    if rc != 0:
+        raise SystemExit(rc)
+
+
+def run_all(cmds: List[List[str]], cwd: Path, tag: str, jobs: int = 1) -> None:
+    """Run independent benchmark commands, up to `jobs` at a time.
+
+    Each command writes its own JSON log, so order does not matter; worker
+    threads just block on their child process. With jobs > 1 the children's
+    output interleaves, so each line is prefixed with its command's index.
+    """
+
+    if jobs <= 1:
+        for cmd in cmds:
+            run(cmd, cwd, tag)
+        return
+    with ThreadPoolExecutor(max_workers=jobs) as ex:
+        list(ex.map(lambda ic: run(ic[1], cwd, tag, f"[{ic[0]}] "), enumerate(cmds)))
+
+
+def load_result(p: Path) -> Optional[Dict[str, Any]]:
+    """Parse one benchmark result JSON, or None if it cannot be read."""
+
+    try:
+        raw = p.read_bytes()
+        return orjson.loads(raw) if orjson is not None else json.loads(raw)
+    except Exception:
+        return None
+
+
+def summary_qps(cfg: Dict[str, Any], agg: Dict[str, Any]) -> Tuple[Any, Any]:
+    """(qps_search, qps_total) for a result summary.
+
+    qps_search falls back to num_queries / search_time_s for logs written
+    before it was recorded; qps_total falls back to the legacy "qps" field.
+    """
+
+    num_q = agg.get("num_queries") or cfg.get("num_queries") or 0
+    search_s = agg.get("search_time_s")
+    qps_search = agg.get("qps_search")
+    if qps_search is None and num_q and search_s is not None:
+        try:
+            s = float(search_s)
+            if s > 0.0:
+                qps_search = float(num_q) / s
+        except Exception:
+            qps_search = None
+    qps_total = agg.get("qps_total")
+    if qps_total is None:
+        qps_total = agg.get("qps")
+    return qps_search, qps_total
+
+
+def print_summaries(paths: List[Path], summary_line: Callable[[Path], Optional[str]]) -> None:
+    """Print summary_line(p) for each path in order, skipping None."""
+
+    # Files are independent; parse them on a small thread pool and print in order.
+    with ThreadPoolExecutor(max_workers=min(32, len(paths) or 1)) as ex:
+        for line in ex.map(summary_line, paths):
+            if line is not None:
+                print(line)